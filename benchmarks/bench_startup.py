@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget check for the healthkit-parse command
+
+Runs `healthkit-parse --help` in fresh interpreters with -X importtime
+and fails if importing the command-line module takes longer than the
+budget, or if it imports modules that belong on slower paths.
+
+Usage:
+    python benchmarks/bench_startup.py [--budget-ms 50] [--runs 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HELP_SNIPPET = (
+    "import sys\n"
+    "from healthkit_xml_reader.cli import main\n"
+    "try:\n"
+    "    main(['--help'])\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "sys.stderr.write('MODULES ' + ' '.join(sorted(sys.modules)) + '\\n')\n"
+)
+
+# Modules that only the parsing, snapshot or daemon paths need
+FORBIDDEN_MODULES = (
+    'xml.etree.ElementTree',
+    'xml.parsers.expat',
+    'http.server',
+    'urllib.request',
+    'concurrent.futures',
+    'dataclasses',
+    'healthkit_xml_reader.parser',
+    'healthkit_xml_reader.models',
+    'healthkit_xml_reader.daemon',
+    'healthkit_xml_reader.timeseries',
+)
+
+
+def measure_once():
+    """
+    Run --help once in a fresh interpreter
+
+    Returns:
+        Tuple of (cumulative import time of healthkit_xml_reader.cli in
+        microseconds, set of module names loaded after --help)
+    """
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', HELP_SNIPPET],
+        env=env, capture_output=True, text=True, check=True
+    )
+
+    cumulative = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('MODULES '):
+            modules = set(line.split()[1:])
+        elif line.startswith('import time:') and line.rstrip().endswith('healthkit_xml_reader.cli'):
+            cumulative = int(line.split('|')[1])
+    if cumulative is None:
+        raise RuntimeError("healthkit_xml_reader.cli import not found in -X importtime output")
+    return cumulative, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check healthkit-parse startup time')
+    parser.add_argument('--budget-ms', type=float, default=50.0,
+                        help='Maximum median import time in milliseconds (default: 50)')
+    parser.add_argument('--runs', type=int, default=7,
+                        help='Number of fresh interpreters to measure (default: 7)')
+    args = parser.parse_args()
+
+    timings = []
+    modules = set()
+    for _ in range(args.runs):
+        cumulative, modules = measure_once()
+        timings.append(cumulative / 1000)
+
+    median = statistics.median(timings)
+    print(f"healthkit_xml_reader.cli import: median {median:.1f} ms, "
+          f"min {min(timings):.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"FAIL: over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+
+    loaded = sorted(set(FORBIDDEN_MODULES) & modules)
+    if loaded:
+        print(f"FAIL: --help imported {', '.join(loaded)}")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
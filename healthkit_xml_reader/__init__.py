@@ -6,12 +6,59 @@ A Python package to parse and analyze Apple HealthKit export.xml files
 __version__ = "0.1.0"
 __author__ = "rickyarm"
 
-from .parser import HealthKitParser
-from .models import HealthRecord, Workout, ActivitySummary
-
-__all__ = [
-    "HealthKitParser",
-    "HealthRecord", 
-    "Workout",
-    "ActivitySummary"
-]
\ No newline at end of file
+from typing import TYPE_CHECKING as _TYPE_CHECKING
+
+# Public names and the submodule defining each one. They are imported on
+# first access so that importing the package (e.g., for the command-line
+# tool) does not pull in the XML parser and data models up front.
+_EXPORTS = {
+    "HealthKitParser": ".parser",
+    "HealthRecord": ".models",
+    "Workout": ".models",
+    "ActivitySummary": ".models",
+    "ActivitySummaryTable": ".activity",
+    "WorkoutEvent": ".models",
+    "WorkoutStatistics": ".models",
+    "WorkoutRoute": ".models",
+    "RouteTrack": ".models",
+    "RecordList": ".models",
+    "RecordMetadata": ".models",
+    "InstantaneousBeats": ".models",
+}
+
+__all__ = list(_EXPORTS)
+
+# Submodules, also imported on first access (e.g., healthkit_xml_reader.models)
+_SUBMODULES = (
+    "activity", "cli", "client", "daemon", "models", "parser",
+    "resume", "routes", "stream", "timeseries", "utils",
+)
+
+if _TYPE_CHECKING:
+    from .parser import HealthKitParser
+    from .models import (
+        HealthRecord, Workout, ActivitySummary,
+        WorkoutEvent, WorkoutStatistics, WorkoutRoute, RouteTrack,
+        RecordList, RecordMetadata, InstantaneousBeats
+    )
+    from .activity import ActivitySummaryTable
+
+
+def __getattr__(name):
+    """Import public names and submodules lazily on first access"""
+    from importlib import import_module
+
+    if name in _SUBMODULES:
+        return import_module(f".{name}", __name__)
+
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
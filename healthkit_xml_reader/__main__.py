@@ -0,0 +1,9 @@
+"""
+Allow running the command-line interface with python -m healthkit_xml_reader
+"""
+
+from .cli import main
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Compact daily table for Apple Watch activity ring summaries
+"""
+
+import math
+from array import array
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from .models import ActivitySummary
+
+
+DateLike = Union[date, datetime, str]
+
+# Column name -> (value column, goal column) for each ring
+RINGS = {
+    'move': ('active_energy_burned', 'active_energy_burned_goal'),
+    'move_time': ('apple_move_time', 'apple_move_time_goal'),
+    'exercise': ('apple_exercise_time', 'apple_exercise_time_goal'),
+    'stand': ('apple_stand_hours', 'apple_stand_hours_goal'),
+}
+
+COLUMNS = (
+    'active_energy_burned',
+    'active_energy_burned_goal',
+    'apple_move_time',
+    'apple_move_time_goal',
+    'apple_exercise_time',
+    'apple_exercise_time_goal',
+    'apple_stand_hours',
+    'apple_stand_hours_goal',
+)
+
+
+def _to_ordinal(day: DateLike) -> int:
+    """
+    Convert a date, datetime or 'YYYY-MM-DD' string to a day ordinal
+
+    Args:
+        day: Date to convert
+
+    Returns:
+        Proleptic Gregorian ordinal of the day
+    """
+    if isinstance(day, str):
+        day = datetime.strptime(day[:10], '%Y-%m-%d')
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.toordinal()
+
+
+def _optional(value: float) -> Optional[float]:
+    """Map the NaN placeholder used for missing values back to None"""
+    return None if math.isnan(value) else value
+
+
+class ActivitySummaryTable:
+    """
+    Date-indexed, column-oriented table of daily activity summaries
+
+    Each field is stored as a flat ``array('d')`` column sorted by date,
+    with NaN marking values missing from the export. A dict from day
+    ordinal to row gives O(1) lookup by date.
+
+    Usage:
+        table = parser.parse_activity_summaries()
+        today = table['2024-02-15']
+        longest = table.longest_streak('move')
+    """
+
+    def __init__(self, summaries: Iterable[ActivitySummary] = ()):
+        """
+        Build a table from activity summaries
+
+        Args:
+            summaries: ActivitySummary objects in any order. If a date
+                       appears more than once, the last summary wins.
+        """
+        by_day: Dict[int, ActivitySummary] = {}
+        for summary in summaries:
+            by_day[_to_ordinal(summary.date)] = summary
+
+        self.ordinals = array('l', sorted(by_day))
+        self.columns: Dict[str, array] = {name: array('d') for name in COLUMNS}
+        self.units: List[Optional[str]] = []
+        self._index: Dict[int, int] = {}
+
+        for row, ordinal in enumerate(self.ordinals):
+            summary = by_day[ordinal]
+            for name, column in self.columns.items():
+                value = getattr(summary, name)
+                column.append(float('nan') if value is None else float(value))
+            self.units.append(summary.active_energy_burned_unit)
+            self._index[ordinal] = row
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __contains__(self, day: DateLike) -> bool:
+        return _to_ordinal(day) in self._index
+
+    def __getitem__(self, day: DateLike) -> ActivitySummary:
+        """
+        Look up the summary for a single day
+
+        Raises:
+            KeyError: If there is no summary for that day
+        """
+        row = self._index.get(_to_ordinal(day))
+        if row is None:
+            raise KeyError(day)
+        return self._row(row)
+
+    def __iter__(self) -> Iterator[ActivitySummary]:
+        for row in range(len(self.ordinals)):
+            yield self._row(row)
+
+    def __repr__(self) -> str:
+        if not self.ordinals:
+            return "ActivitySummaryTable(days=0)"
+        return (f"ActivitySummaryTable(days={len(self)}, "
+                f"from={self.dates[0]}, to={self.dates[-1]})")
+
+    def get(self, day: DateLike, default: Optional[ActivitySummary] = None) -> Optional[ActivitySummary]:
+        """
+        Look up the summary for a day, returning default if it is missing
+        """
+        row = self._index.get(_to_ordinal(day))
+        return default if row is None else self._row(row)
+
+    @property
+    def dates(self) -> List[date]:
+        """Dates covered by the table, in ascending order"""
+        return [date.fromordinal(ordinal) for ordinal in self.ordinals]
+
+    def column(self, name: str) -> array:
+        """
+        Get one field as a flat array, aligned with ``dates``
+
+        Args:
+            name: Field name (e.g., 'apple_exercise_time')
+
+        Returns:
+            array('d') with NaN for days missing that field
+        """
+        return self.columns[name]
+
+    def goal_met(self, ring: str = 'all') -> List[bool]:
+        """
+        Check, for every day, whether a ring's goal was reached
+
+        A day with no goal (missing or zero) never counts as met.
+
+        Args:
+            ring: 'move', 'move_time', 'exercise', 'stand', or 'all'
+                  for the move, exercise and stand rings together. For
+                  'all', days with a move time goal use 'move_time' as
+                  the move ring instead of 'move'.
+
+        Returns:
+            List of booleans aligned with ``dates``
+        """
+        if ring == 'all':
+            move_time_goals = self.columns['apple_move_time_goal']
+            move = [
+                move_time if goal > 0 else energy
+                for energy, move_time, goal in zip(
+                    self.goal_met('move'), self.goal_met('move_time'), move_time_goals)
+            ]
+            met = [move, self.goal_met('exercise'), self.goal_met('stand')]
+            return [all(day) for day in zip(*met)]
+
+        if ring not in RINGS:
+            raise ValueError(f"Unknown ring: {ring}")
+        value_name, goal_name = RINGS[ring]
+        # NaN comparisons are False, so missing values and goals drop out
+        return [
+            goal > 0 and value >= goal
+            for value, goal in zip(self.columns[value_name], self.columns[goal_name])
+        ]
+
+    def completion_rate(self, ring: str = 'all') -> float:
+        """
+        Fraction of days on which a ring's goal was reached
+
+        Args:
+            ring: Ring name, as for goal_met()
+
+        Returns:
+            Value between 0.0 and 1.0 (0.0 for an empty table)
+        """
+        if not self.ordinals:
+            return 0.0
+        return sum(self.goal_met(ring)) / len(self.ordinals)
+
+    def longest_streak(self, ring: str = 'all') -> int:
+        """
+        Longest run of consecutive calendar days with the goal reached
+
+        A day missing from the export breaks the streak.
+        """
+        return max(self._streaks(self.goal_met(ring)), default=0)
+
+    def current_streak(self, ring: str = 'all') -> int:
+        """
+        Length of the streak ending on the last day in the table
+        """
+        met = self.goal_met(ring)
+        if not met or not met[-1]:
+            return 0
+        return self._streaks(met)[-1]
+
+    def _streaks(self, goal_met: List[bool]) -> List[int]:
+        """Lengths of every streak of met goals, in date order"""
+        streaks: List[int] = []
+        run = 0
+        previous = None
+        for ordinal, met in zip(self.ordinals, goal_met):
+            if not met:
+                if run:
+                    streaks.append(run)
+                run = 0
+            elif run and ordinal == previous + 1:
+                run += 1
+            else:
+                if run:
+                    streaks.append(run)
+                run = 1
+            previous = ordinal
+        if run:
+            streaks.append(run)
+        return streaks
+
+    def _row(self, row: int) -> ActivitySummary:
+        """Rebuild an ActivitySummary from one row of the table"""
+        columns = self.columns
+        stand_goal = _optional(columns['apple_stand_hours_goal'][row])
+        return ActivitySummary(
+            date=datetime.fromordinal(self.ordinals[row]),
+            active_energy_burned=columns['active_energy_burned'][row],
+            apple_exercise_time=columns['apple_exercise_time'][row],
+            apple_stand_hours=int(columns['apple_stand_hours'][row]),
+            active_energy_burned_goal=_optional(columns['active_energy_burned_goal'][row]),
+            active_energy_burned_unit=self.units[row],
+            apple_move_time=_optional(columns['apple_move_time'][row]),
+            apple_move_time_goal=_optional(columns['apple_move_time_goal'][row]),
+            apple_exercise_time_goal=_optional(columns['apple_exercise_time_goal'][row]),
+            apple_stand_hours_goal=None if stand_goal is None else int(stand_goal)
+        )
@@ -0,0 +1,212 @@
+"""
+Command-line interface for HealthKit XML Reader
+
+Usage:
+    healthkit-parse records path/to/export.xml [--type TYPE] [--days N]
+    healthkit-parse types path/to/export.xml
+    healthkit-parse serve path/to/export.xml [other_export.xml ...]
+
+The older single-command form is still accepted:
+    healthkit-parse path/to/export.xml [--type TYPE] [--days N] [--list-types]
+
+If a query daemon (healthkit-parse serve) is serving the export, records
+and types are answered by it instead of re-parsing the file.
+
+Only argparse and typing are imported up front. The parser, the daemon
+client and the HTTP server are imported inside the commands that need
+them, so --help and daemon-backed queries start quickly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+
+COMMANDS = ('records', 'types', 'serve')
+
+# Options that take a value, in either the command or the older form
+VALUE_OPTIONS = ('--type', '--days', '--host', '--port')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser with one subparser per command
+    """
+    parser = argparse.ArgumentParser(
+        prog='healthkit-parse',
+        description='Parse and analyze Apple Health export data'
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    records = commands.add_parser('records', help='Show recent records')
+    records.add_argument('xml_file', help='Path to Apple Health export.xml file')
+    records.add_argument(
+        '--type',
+        dest='record_type',
+        help='Filter by record type (e.g., StepCount, HeartRate)'
+    )
+    records.add_argument(
+        '--days',
+        type=int,
+        default=7,
+        help='Number of days to show (default: 7)'
+    )
+    records.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Parse the file even if a query daemon is running'
+    )
+    records.set_defaults(handler=run_records)
+
+    types = commands.add_parser('types', help='List all available record types')
+    types.add_argument('xml_file', help='Path to Apple Health export.xml file')
+    types.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Parse the file even if a query daemon is running'
+    )
+    types.set_defaults(handler=run_types)
+
+    serve = commands.add_parser('serve', help='Keep exports in memory and answer queries')
+    serve.add_argument('xml_files', nargs='+', help='Paths to export.xml files')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    serve.add_argument('--port', type=int, default=0, help='Port to bind (default: any free port)')
+    serve.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Main entry point for the healthkit-parse command"""
+    argv = _upgrade_legacy_argv(sys.argv[1:] if argv is None else list(argv))
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+def run_records(args: argparse.Namespace) -> None:
+    """Show records of one type (or all types) from the last N days"""
+    from datetime import datetime, timedelta
+    from .utils import simplify_record_type
+
+    client = _discover(args)
+
+    # Add HK prefix if not present
+    full_type = args.record_type
+    if full_type and not full_type.startswith('HK'):
+        full_type = f'HKQuantityTypeIdentifier{args.record_type}'
+
+    if client is not None:
+        # The daemon filters by date and only sends the records shown
+        print(f"\nQuerying {args.record_type or 'all'} records...")
+        count, sample_records = client.records(full_type, days=args.days, limit=10)
+    else:
+        from .parser import HealthKitParser
+        from .utils import chronological_key, filter_by_date_range
+
+        health_parser = HealthKitParser(args.xml_file)
+        if full_type:
+            print(f"\nParsing {args.record_type} records...")
+            records = health_parser.parse_records(full_type)
+        else:
+            print("\nParsing all records...")
+            records = health_parser.parse_records()
+
+        # Filter by date range (record dates carry their UTC offset)
+        end_date = datetime.now().astimezone()
+        start_date = end_date - timedelta(days=args.days)
+        filtered_records = filter_by_date_range(records, start_date, end_date)
+        # Same order as the daemon's answers
+        filtered_records.sort(key=chronological_key)
+        count, sample_records = len(filtered_records), filtered_records[:10]
+
+    print(f"Found {count} records in last {args.days} days")
+
+    # Display sample records
+    print(f"\nShowing first 10 records:")
+    for record in sample_records:
+        record_type = simplify_record_type(record.record_type)
+        print(f"  [{record.start_date}] {record_type}: {record.value} {record.unit}")
+
+    if count > 10:
+        print(f"  ... and {count - 10} more")
+
+
+def run_types(args: argparse.Namespace) -> None:
+    """List all record types in the export"""
+    from .utils import simplify_record_type
+
+    client = _discover(args)
+    print("\nAvailable record types:")
+    if client is not None:
+        record_types = client.record_types()
+    else:
+        from .parser import HealthKitParser
+
+        record_types = HealthKitParser(args.xml_file).get_record_types()
+    for rt in record_types:
+        simplified = simplify_record_type(rt)
+        print(f"  {simplified}")
+    print(f"\nTotal: {len(record_types)} types")
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Load exports and serve queries until interrupted"""
+    from .daemon import serve
+
+    print(f"Loading {len(args.xml_files)} export(s)...")
+    serve(args.xml_files, host=args.host, port=args.port)
+
+
+def _discover(args: argparse.Namespace):
+    """Find a daemon serving the export, announcing which path is used"""
+    client = None
+    if not args.no_daemon:
+        from .client import DaemonClient
+
+        client = DaemonClient.discover(args.xml_file)
+    if client is not None:
+        print(f"Querying daemon for {args.xml_file}...")
+    else:
+        print(f"Loading data from {args.xml_file}...")
+    return client
+
+
+def _upgrade_legacy_argv(argv: List[str]) -> List[str]:
+    """
+    Translate the older 'export.xml [--list-types] ...' form to a command
+
+    The older form is recognized by its first positional argument not
+    being a command name, wherever options appear around it.
+    """
+    detect = argparse.ArgumentParser(add_help=False)
+    detect.add_argument('positionals', nargs='*')
+    for option in VALUE_OPTIONS:
+        detect.add_argument(option)
+    positionals = detect.parse_known_args(argv)[0].positionals
+    if not positionals or positionals[0] in COMMANDS:
+        return argv
+
+    legacy = argparse.ArgumentParser(prog='healthkit-parse')
+    legacy.add_argument('xml_file')
+    legacy.add_argument('--type', dest='record_type')
+    legacy.add_argument('--days')
+    legacy.add_argument('--list-types', action='store_true')
+    legacy.add_argument('--no-daemon', action='store_true')
+    args = legacy.parse_args(argv)
+
+    upgraded = ['types' if args.list_types else 'records', args.xml_file]
+    if not args.list_types:
+        if args.record_type:
+            upgraded += ['--type', args.record_type]
+        if args.days:
+            upgraded += ['--days', args.days]
+    if args.no_daemon:
+        upgraded.append('--no-daemon')
+    return upgraded
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Client for the warm query daemon (see daemon.py)
+
+Kept separate from the server so the command-line tool can look for a
+running daemon without importing the parser or the HTTP server, and
+only imports urllib once a daemon serving the export has been found.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .models import HealthRecord
+
+
+def default_discovery_path() -> str:
+    """
+    Path of the file announcing a running daemon
+
+    Can be overridden with the HEALTHKIT_DAEMON_FILE environment variable.
+    """
+    override = os.environ.get('HEALTHKIT_DAEMON_FILE')
+    if override:
+        return override
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_dir, 'healthkit-xml-reader', 'daemon.json')
+
+
+def export_key(xml_file_path: str) -> Dict[str, Any]:
+    """
+    Identify an export file by path, size and modification time
+
+    A daemon only answers for an export whose key still matches, so
+    edited or replaced files are never served from stale memory.
+    """
+    stat = os.stat(xml_file_path)
+    return {
+        'path': os.path.abspath(xml_file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+
+def record_to_dict(record: 'HealthRecord') -> Dict[str, Optional[str]]:
+    """Convert a HealthRecord to a JSON-serializable dictionary"""
+    return {
+        'type': record.record_type,
+        'source': record.source_name,
+        'value': record.value,
+        'unit': record.unit,
+        'start_date': None if record.start_date is None else record.start_date.isoformat(),
+        'end_date': None if record.end_date is None else record.end_date.isoformat(),
+        'creation_date': None if record.creation_date is None else record.creation_date.isoformat(),
+    }
+
+
+def record_from_dict(data: Dict[str, Optional[str]]) -> 'HealthRecord':
+    """Rebuild a HealthRecord from record_to_dict() output"""
+    from .models import HealthRecord
+
+    def parse(value: Optional[str]) -> Optional[datetime]:
+        return None if value is None else datetime.fromisoformat(value)
+
+    return HealthRecord(
+        record_type=data['type'],
+        source_name=data['source'],
+        value=data['value'],
+        unit=data['unit'],
+        start_date=parse(data['start_date']),
+        end_date=parse(data['end_date']),
+        creation_date=parse(data['creation_date'])
+    )
+
+
+class DaemonClient:
+    """
+    Client for a running query daemon
+
+    Usage:
+        client = DaemonClient.discover('export.xml')
+        if client is not None:
+            types = client.record_types()
+    """
+
+    def __init__(self, xml_file_path: str, host: str, port: int, token: str, timeout: float = 5.0):
+        """
+        Args:
+            xml_file_path: Export to query
+            host: Daemon host
+            port: Daemon port
+            token: Request token from the discovery file
+            timeout: Request timeout, in seconds
+        """
+        self.export = os.path.abspath(xml_file_path)
+        self.base_url = f"http://{host}:{port}"
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def discover(
+        cls,
+        xml_file_path: str,
+        discovery_path: Optional[str] = None,
+        timeout: float = 0.5
+    ) -> Optional['DaemonClient']:
+        """
+        Find a running daemon serving an up-to-date copy of an export
+
+        Args:
+            xml_file_path: Export to query
+            discovery_path: Discovery file (default_discovery_path() if None)
+            timeout: Connection timeout for the liveness check, in seconds
+
+        Returns:
+            DaemonClient, or None if no suitable daemon is running
+        """
+        try:
+            with open(discovery_path or default_discovery_path(), encoding='utf-8') as discovery_file:
+                info = json.load(discovery_file)
+            key = export_key(xml_file_path)
+        except (OSError, ValueError):
+            return None
+
+        if key not in info.get('exports', []) or 'token' not in info:
+            return None
+
+        client = cls(xml_file_path, info['host'], info['port'], info['token'])
+        try:
+            client._get('/health', timeout=timeout)
+        except (OSError, ValueError):
+            return None
+        return client
+
+    def record_types(self) -> List[str]:
+        """All record types in the export"""
+        return self._get('/types', export=self.export)['types']
+
+    def records(
+        self,
+        record_type: Optional[str] = None,
+        days: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[int, List['HealthRecord']]:
+        """
+        Records of one type (or all types) from the last N days
+
+        Returns:
+            Tuple of (total number of matching records, first `limit` records)
+        """
+        params = {'export': self.export}
+        if record_type:
+            params['type'] = record_type
+        if days is not None:
+            params['days'] = days
+        if limit is not None:
+            params['limit'] = limit
+        response = self._get('/records', **params)
+        return response['count'], [record_from_dict(r) for r in response['records']]
+
+    def aggregate(self, record_type: str, days: Optional[int] = None, function: str = 'sum') -> Dict[str, float]:
+        """Per-day aggregate of a record type's values"""
+        params = {'export': self.export, 'type': record_type, 'fn': function}
+        if days is not None:
+            params['days'] = days
+        return self._get('/aggregate', **params)['values']
+
+    def _get(self, path: str, timeout: Optional[float] = None, **params: Any) -> Dict[str, Any]:
+        # Imported here: only needed once a daemon has been found
+        from urllib.error import URLError
+        from urllib.parse import urlencode
+        from urllib.request import Request, urlopen
+
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        request = Request(url, headers={'Authorization': f"Bearer {self.token}"})
+        try:
+            with urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.load(response)
+        except URLError as e:
+            # HTTPError carries the daemon's JSON error message
+            if hasattr(e, 'read'):
+                raise ValueError(json.load(e).get('error', str(e)))
+            raise
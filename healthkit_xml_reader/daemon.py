@@ -0,0 +1,319 @@
+"""
+Warm query daemon that keeps parsed exports resident in memory
+
+The daemon parses one or more exports once, keeps their records as
+compressed series (see timeseries.py) and answers record, record type
+and aggregation queries over localhost HTTP. While it runs, a discovery
+file records its port and the exports it serves, so the command-line
+tool can send queries to it (see client.py) instead of re-parsing
+export.xml.
+
+The discovery file is only readable by its owner and holds a random
+token that every request must present as a bearer token, so other local
+users cannot query the daemon. Requests whose Host header does not name
+the loopback interface are rejected, so web pages cannot reach the
+daemon through DNS rebinding.
+
+Usage:
+    healthkit-parse serve export.xml [other_export.xml ...]
+    python -m healthkit_xml_reader.daemon export.xml [other_export.xml ...]
+"""
+
+import argparse
+import heapq
+import hmac
+import json
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+from .client import default_discovery_path, export_key, record_to_dict
+from .models import HealthRecord
+from .timeseries import CompressedSeries, compress_export
+from .utils import chronological_key
+
+
+DEFAULT_HOST = '127.0.0.1'
+
+# Host header names accepted by the daemon
+ALLOWED_HOSTS = ('127.0.0.1', 'localhost')
+
+AGGREGATES = {
+    'sum': sum,
+    'mean': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+    'count': len,
+}
+
+
+class LoadedExport:
+    """
+    One export held in memory as compressed series, keyed by record type
+    """
+
+    def __init__(self, xml_file_path: str):
+        """
+        Stream an export's records into compressed series
+
+        Records are never all held as HealthRecord objects at once; see
+        compress_export().
+
+        Args:
+            xml_file_path: Path to the Apple Health export.xml file
+        """
+        self.key = export_key(xml_file_path)
+        self.series: Dict[str, List[CompressedSeries]] = {}
+        for series in compress_export(xml_file_path):
+            self.series.setdefault(series.record_type, []).append(series)
+        self.record_types = sorted(self.series)
+
+    def records(
+        self,
+        record_type: Optional[str] = None,
+        days: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> Iterable[HealthRecord]:
+        """
+        Records of one type (or all types) that started in the last N days
+
+        Records of every series are merged in chronological_key() order.
+        """
+        start = None
+        if days is not None:
+            now = now or datetime.now().astimezone()
+            start = now - timedelta(days=days)
+
+        types = [record_type] if record_type else self.record_types
+        return heapq.merge(
+            *(series.iter_range(start=start, end=now)
+              for name in types for series in self.series.get(name, ())),
+            key=chronological_key
+        )
+
+    def aggregate(
+        self,
+        record_type: str,
+        days: Optional[int] = None,
+        function: str = 'sum'
+    ) -> Dict[str, float]:
+        """
+        Aggregate numeric values per day (in each record's own timezone)
+
+        Args:
+            record_type: Record type to aggregate
+            days: Only include records from the last N days
+            function: One of 'sum', 'mean', 'min', 'max', 'count'
+
+        Returns:
+            Dictionary of 'YYYY-MM-DD' to aggregated value, in date order
+
+        Raises:
+            ValueError: If the aggregate function is unknown
+        """
+        if function not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate: {function}")
+
+        by_day: Dict[str, List[float]] = {}
+        for record in self.records(record_type, days):
+            try:
+                value = float(record.value)
+            except (TypeError, ValueError):
+                continue
+            by_day.setdefault(record.start_date.strftime('%Y-%m-%d'), []).append(value)
+
+        return {day: AGGREGATES[function](values) for day, values in sorted(by_day.items())}
+
+
+class QueryServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering queries against loaded exports
+    """
+
+    daemon_threads = True
+
+    def __init__(self, exports: Iterable[LoadedExport], host: str = DEFAULT_HOST, port: int = 0):
+        """
+        Args:
+            exports: Exports to serve
+            host: Interface to bind (localhost by default)
+            port: Port to bind (0 picks a free port)
+        """
+        self.exports = {export.key['path']: export for export in exports}
+        self.token = secrets.token_urlsafe(32)
+        super().__init__((host, port), QueryHandler)
+
+    def write_discovery_file(self, discovery_path: str) -> None:
+        """
+        Announce this server so clients can find it
+
+        The file holds the request token, so it is created readable and
+        writable by its owner only (mode 0600).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(discovery_path)), mode=0o700, exist_ok=True)
+        temp_path = f"{discovery_path}.tmp"
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with open(fd, 'w', encoding='utf-8') as discovery_file:
+            json.dump({
+                'host': self.server_address[0],
+                'port': self.server_address[1],
+                'pid': os.getpid(),
+                'token': self.token,
+                'exports': [export.key for export in self.exports.values()],
+            }, discovery_file)
+        os.replace(temp_path, discovery_path)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for QueryServer
+
+    Endpoints (all GET, all JSON):
+        /health                                     loaded exports
+        /types?export=PATH                          record types
+        /records?export=PATH[&type=T][&days=N][&limit=N]
+        /aggregate?export=PATH&type=T[&days=N][&fn=sum]
+
+    Every request needs an 'Authorization: Bearer TOKEN' header with the
+    token from the discovery file, and a Host header naming localhost.
+    """
+
+    def do_GET(self) -> None:
+        if not self._host_allowed():
+            self._send(403, {'error': "Host not allowed"})
+            return
+        if not self._authorized():
+            self._send(401, {'error': "Missing or invalid token"})
+            return
+
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path == '/health':
+                self._send(200, {'exports': [e.key for e in self.server.exports.values()]})
+                return
+
+            export = self.server.exports.get(query.get('export'))
+            if export is None:
+                self._send(404, {'error': f"Export not loaded: {query.get('export')}"})
+                return
+
+            days = int(query['days']) if 'days' in query else None
+            if url.path == '/types':
+                self._send(200, {'types': export.record_types})
+            elif url.path == '/records':
+                limit = int(query['limit']) if 'limit' in query else None
+                count = 0
+                records = []
+                for record in export.records(query.get('type'), days):
+                    if limit is None or count < limit:
+                        records.append(record_to_dict(record))
+                    count += 1
+                self._send(200, {'count': count, 'records': records})
+            elif url.path == '/aggregate':
+                if 'type' not in query:
+                    self._send(400, {'error': "Missing parameter: type"})
+                    return
+                values = export.aggregate(query['type'], days, query.get('fn', 'sum'))
+                self._send(200, {'values': values})
+            else:
+                self._send(404, {'error': f"Unknown endpoint: {url.path}"})
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+
+    def _host_allowed(self) -> bool:
+        """Whether the Host header names the loopback interface"""
+        host = self.headers.get('Host', '')
+        name, _, port = host.rpartition(':')
+        if not port.isdigit():
+            name = host
+        return name.lower() in ALLOWED_HOSTS
+
+    def _authorized(self) -> bool:
+        """Whether the request carries the server's token"""
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer':
+            return False
+        return hmac.compare_digest(token.strip().encode('utf-8'), self.server.token.encode('utf-8'))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep request logging off the console"""
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(
+    xml_file_paths: Iterable[str],
+    host: str = DEFAULT_HOST,
+    port: int = 0,
+    discovery_path: Optional[str] = None,
+    ready: Optional[threading.Event] = None
+) -> None:
+    """
+    Load exports and serve queries until interrupted
+
+    Args:
+        xml_file_paths: Exports to load
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        discovery_path: Discovery file (default_discovery_path() if None)
+        ready: Optional event set once the server accepts queries
+    """
+    discovery_path = discovery_path or default_discovery_path()
+    exports = [LoadedExport(path) for path in xml_file_paths]
+    server = QueryServer(exports, host, port)
+    server.write_discovery_file(discovery_path)
+    print(f"Serving {len(exports)} export(s) on http://{host}:{server.server_address[1]}")
+    if ready is not None:
+        ready.set()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        _remove_discovery_file(discovery_path)
+
+
+def _remove_discovery_file(discovery_path: str) -> None:
+    """Remove the discovery file, unless another daemon has replaced it"""
+    try:
+        with open(discovery_path, encoding='utf-8') as discovery_file:
+            if json.load(discovery_file).get('pid') != os.getpid():
+                return
+        os.remove(discovery_path)
+    except (OSError, ValueError):
+        pass
+
+
+def main() -> None:
+    """Entry point for python -m healthkit_xml_reader.daemon"""
+    parser = argparse.ArgumentParser(
+        description='Keep Apple Health exports in memory and answer queries'
+    )
+    parser.add_argument('xml_files', nargs='+', help='Paths to export.xml files')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface to bind')
+    parser.add_argument('--port', type=int, default=0, help='Port to bind (default: any free port)')
+    args = parser.parse_args()
+
+    print(f"Loading {len(args.xml_files)} export(s)...")
+    serve(args.xml_files, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,11 @@
 Data models for HealthKit records
 """
 
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 @dataclass
@@ -36,6 +38,188 @@ class HealthRecord:
                 f"date={self.start_date})")
 
 
+@dataclass
+class RecordMetadata:
+    """
+    MetadataEntry children of parsed records, stored as side arrays
+    
+    Entries are kept in record order; ``record_index`` links each entry
+    to the position of its record in the RecordList.
+    
+    Attributes:
+        record_index: Index of the parent record for each entry
+        keys: Metadata key for each entry
+        values: Metadata value for each entry
+    """
+    record_index: array = field(default_factory=lambda: array('l'))
+    keys: List[str] = field(default_factory=list)
+    values: List[str] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        """Number of metadata entries"""
+        return len(self.record_index)
+    
+    def for_record(self, index: int) -> Dict[str, str]:
+        """
+        Get the metadata entries of one record
+        
+        Args:
+            index: Position of the record in the RecordList
+        
+        Returns:
+            Dictionary of metadata keys to values (empty if none)
+        """
+        lo = bisect_left(self.record_index, index)
+        hi = bisect_right(self.record_index, index, lo)
+        return dict(zip(self.keys[lo:hi], self.values[lo:hi]))
+
+
+@dataclass
+class InstantaneousBeats:
+    """
+    Beat-to-beat heart rate readings attached to HRV records
+    
+    Readings are kept in record order; ``record_index`` links each reading
+    to the position of its record in the RecordList.
+    
+    Attributes:
+        record_index: Index of the parent record for each reading
+        bpm: Instantaneous heart rate, in beats per minute
+        offsets: Seconds from the parent record's start date (NaN if unknown)
+    """
+    record_index: array = field(default_factory=lambda: array('l'))
+    bpm: array = field(default_factory=lambda: array('d'))
+    offsets: array = field(default_factory=lambda: array('d'))
+    
+    def __len__(self) -> int:
+        """Number of beat readings"""
+        return len(self.record_index)
+    
+    def for_record(self, index: int) -> Tuple[array, array]:
+        """
+        Get the beat readings of one record
+        
+        Args:
+            index: Position of the record in the RecordList
+        
+        Returns:
+            Tuple of (bpm, offsets) arrays (empty if none)
+        """
+        lo = bisect_left(self.record_index, index)
+        hi = bisect_right(self.record_index, index, lo)
+        return self.bpm[lo:hi], self.offsets[lo:hi]
+
+
+class RecordList(list):
+    """
+    List of HealthRecord objects with optional side tables
+    
+    Behaves exactly like a list. ``metadata`` and ``beats`` are None
+    unless they were requested from parse_records().
+    """
+    
+    def __init__(
+        self,
+        records: Iterable[HealthRecord] = (),
+        metadata: Optional[RecordMetadata] = None,
+        beats: Optional[InstantaneousBeats] = None
+    ):
+        super().__init__(records)
+        self.metadata = metadata
+        self.beats = beats
+
+
+@dataclass
+class WorkoutEvent:
+    """
+    Represents an event within a workout (pause, resume, lap, segment)
+    
+    Attributes:
+        event_type: Type of event (e.g., HKWorkoutEventTypePause)
+        date: When the event occurred
+        duration: Duration of the event, if any
+        duration_unit: Unit for duration (usually minutes)
+    """
+    event_type: str
+    date: Optional[datetime] = None
+    duration: Optional[float] = None
+    duration_unit: Optional[str] = None
+
+
+@dataclass
+class WorkoutStatistics:
+    """
+    Represents aggregate statistics for one quantity over a workout
+    
+    Attributes:
+        statistics_type: Quantity type (e.g., HKQuantityTypeIdentifierHeartRate)
+        unit: Unit of measurement
+        sum: Total over the workout (cumulative quantities)
+        average: Average over the workout (discrete quantities)
+        minimum: Minimum over the workout (discrete quantities)
+        maximum: Maximum over the workout (discrete quantities)
+        start_date: Start of the statistics interval
+        end_date: End of the statistics interval
+    """
+    statistics_type: str
+    unit: Optional[str] = None
+    sum: Optional[float] = None
+    average: Optional[float] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+@dataclass
+class RouteTrack:
+    """
+    GPS trackpoints of a workout route, stored as parallel arrays
+    
+    Attributes:
+        latitudes: Latitude of each trackpoint, in degrees
+        longitudes: Longitude of each trackpoint, in degrees
+        elevations: Elevation of each trackpoint, in meters (NaN if missing)
+        timestamps: POSIX timestamp of each trackpoint (NaN if missing)
+    """
+    latitudes: array = field(default_factory=lambda: array('d'))
+    longitudes: array = field(default_factory=lambda: array('d'))
+    elevations: array = field(default_factory=lambda: array('d'))
+    timestamps: array = field(default_factory=lambda: array('d'))
+    
+    def __len__(self) -> int:
+        """Number of trackpoints"""
+        return len(self.latitudes)
+    
+    def __repr__(self) -> str:
+        """String representation of the route track"""
+        return f"RouteTrack(points={len(self)})"
+
+
+@dataclass
+class WorkoutRoute:
+    """
+    Represents the GPS route recorded during a workout
+    
+    The trackpoints live in a separate GPX file referenced by the export;
+    ``track`` stays None until the route is loaded.
+    
+    Attributes:
+        file_path: Path of the GPX file, as given by the export
+        source_name: Source device/app
+        start_date: Route start time
+        end_date: Route end time
+        metadata: Metadata entries attached to the route
+        track: Loaded trackpoints, or None if not loaded yet
+    """
+    file_path: Optional[str] = None
+    source_name: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    metadata: Dict[str, str] = field(default_factory=dict)
+    track: Optional[RouteTrack] = None
+
+
 @dataclass
 class Workout:
     """
@@ -50,6 +234,10 @@ class Workout:
         source_name: Source device/app
         start_date: Workout start time
         end_date: Workout end time
+        events: Workout events (None unless requested)
+        statistics: Statistics keyed by quantity type (None unless requested)
+        metadata: Metadata entries (None unless requested)
+        route: GPS route reference (None unless requested or absent)
     """
     workout_type: str
     duration: float
@@ -59,6 +247,10 @@ class Workout:
     source_name: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    events: Optional[List[WorkoutEvent]] = None
+    statistics: Optional[Dict[str, WorkoutStatistics]] = None
+    metadata: Optional[Dict[str, str]] = None
+    route: Optional[WorkoutRoute] = None
     
     def __repr__(self) -> str:
         """String representation of the workout"""
@@ -77,11 +269,23 @@ class ActivitySummary:
         active_energy_burned: Active calories burned
         apple_exercise_time: Exercise minutes
         apple_stand_hours: Stand hours achieved
+        active_energy_burned_goal: Move ring goal (active calories)
+        active_energy_burned_unit: Unit for active energy (usually kcal)
+        apple_move_time: Move minutes (move-time based rings)
+        apple_move_time_goal: Move minutes goal
+        apple_exercise_time_goal: Exercise minutes goal
+        apple_stand_hours_goal: Stand hours goal
     """
     date: datetime
     active_energy_burned: float
     apple_exercise_time: float
     apple_stand_hours: int
+    active_energy_burned_goal: Optional[float] = None
+    active_energy_burned_unit: Optional[str] = None
+    apple_move_time: Optional[float] = None
+    apple_move_time_goal: Optional[float] = None
+    apple_exercise_time_goal: Optional[float] = None
+    apple_stand_hours_goal: Optional[int] = None
     
     def __repr__(self) -> str:
         """String representation of activity summary"""
@@ -2,10 +2,64 @@
 Core XML parsing functionality for HealthKit export files
 """
 
+import os
+import sys
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from .models import HealthRecord, Workout, ActivitySummary
+from .models import (
+    HealthRecord, Workout, ActivitySummary,
+    WorkoutEvent, WorkoutStatistics, WorkoutRoute,
+    RecordList, RecordMetadata, InstantaneousBeats
+)
+from .activity import ActivitySummaryTable
+from .stream import RecordStream, RecordItem, iter_root_elements
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+    from .resume import RecordSink
+
+# Optional groups of Record child elements accepted by parse_records()
+RECORD_FIELD_GROUPS = ('metadata', 'beats')
+
+# Optional groups of Workout child elements accepted by parse_workouts()
+WORKOUT_FIELD_GROUPS = ('events', 'statistics', 'metadata', 'route')
+
+
+def parse_date(date_string: Optional[str]) -> Optional[datetime]:
+    """
+    Parse ISO format date string to datetime object
+    
+    Args:
+        date_string: ISO format date string
+    
+    Returns:
+        datetime object or None if parsing fails
+    """
+    if not date_string:
+        return None
+    
+    try:
+        # Apple Health uses ISO 8601 format with timezone
+        # Example: "2024-02-15 10:30:00 -0500"
+        return datetime.fromisoformat(date_string.replace(' ', 'T', 1))
+    except (ValueError, AttributeError):
+        return None
+
+
+def build_record(attrs: Dict[str, str]) -> HealthRecord:
+    """
+    Create a HealthRecord object from Record XML attributes
+    """
+    return HealthRecord(
+        record_type=attrs.get('type'),
+        source_name=attrs.get('sourceName'),
+        value=attrs.get('value'),
+        unit=attrs.get('unit'),
+        start_date=parse_date(attrs.get('startDate')),
+        end_date=parse_date(attrs.get('endDate')),
+        creation_date=parse_date(attrs.get('creationDate'))
+    )
 
 
 class HealthKitParser:
@@ -44,52 +98,176 @@ class HealthKitParser:
         except ET.ParseError as e:
             raise ET.ParseError(f"Failed to parse XML: {e}")
     
-    def parse_records(self, record_type: Optional[str] = None) -> List[HealthRecord]:
+    def parse_records(
+        self,
+        record_type: Optional[str] = None,
+        include: Optional[Iterable[str]] = None
+    ) -> RecordList:
         """
         Parse health records from the XML file
         
+        If load_xml() has already been called, records are read from the
+        loaded tree. Otherwise the file is streamed without building a
+        tree, and the children of records are skipped unless requested.
+        
         Args:
             record_type: Optional filter for specific record type 
                         (e.g., 'HKQuantityTypeIdentifierStepCount')
+            include: Optional field groups to read from each Record's
+                     children: 'metadata' (MetadataEntry) and/or 'beats'
+                     (HRV InstantaneousBeatsPerMinute). They are stored
+                     as side tables on the returned RecordList.
         
         Returns:
-            List of HealthRecord objects
+            RecordList of HealthRecord objects
+        
+        Raises:
+            ValueError: If an unknown field group is requested
         """
+        include = set(include or ())
+        unknown = include.difference(RECORD_FIELD_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown record field groups: {sorted(unknown)}")
+        
+        records = RecordList(
+            metadata=RecordMetadata() if 'metadata' in include else None,
+            beats=InstantaneousBeats() if 'beats' in include else None
+        )
+        
         if self.root is None:
-            self.load_xml()
+            items = RecordStream(
+                self.xml_file_path,
+                record_type=record_type,
+                include_metadata=records.metadata is not None,
+                include_beats=records.beats is not None
+            )
+        else:
+            items = self._iter_tree_records(record_type, include)
+        
+        for attrs, metadata, beats in items:
+            record = build_record(attrs)
+            if metadata:
+                self._add_record_metadata(records.metadata, len(records), metadata)
+            if beats:
+                self._add_record_beats(records.beats, len(records), record.start_date, beats)
+            records.append(record)
+        
+        return records
+    
+    def parse_records_resumable(
+        self,
+        sink: 'RecordSink',
+        checkpoint_path: str,
+        record_type: Optional[str] = None,
+        checkpoint_every: int = 100000
+    ) -> int:
+        """
+        Stream records into a sink, checkpointing so a killed parse can resume
+        
+        Calling this again with the same checkpoint path after a crash or
+        preemption continues from the last checkpoint, without duplicating
+        or dropping records in the sink.
         
-        records = []
+        Args:
+            sink: Destination for records (e.g., resume.CsvSink)
+            checkpoint_path: Path of the JSON checkpoint file
+            record_type: Optional filter for specific record type
+            checkpoint_every: Number of records between checkpoints
+        
+        Returns:
+            Total number of records written to the sink
+        """
+        from .resume import ResumableParse
+        
+        return ResumableParse(
+            self.xml_file_path,
+            sink,
+            checkpoint_path,
+            record_type=record_type,
+            checkpoint_every=checkpoint_every
+        ).run()
+    
+    def _iter_tree_records(self, record_type: Optional[str], include: set) -> Iterator[RecordItem]:
+        """
+        Yield (attributes, metadata, beats) for records in the loaded tree
         
+        Mirrors RecordStream for callers that already loaded the XML.
+        """
         # Find all Record elements in the XML
-        for record_elem in self.root.findall('.//Record'):
-            # Get attributes from the XML element
+        for record_elem in self.root.iter('Record'):
             attrs = record_elem.attrib
             
             # Filter by type if specified
             if record_type and attrs.get('type') != record_type:
                 continue
             
-            # Create HealthRecord object from XML attributes
-            record = HealthRecord(
-                record_type=attrs.get('type'),
-                source_name=attrs.get('sourceName'),
-                value=attrs.get('value'),
-                unit=attrs.get('unit'),
-                start_date=self._parse_date(attrs.get('startDate')),
-                end_date=self._parse_date(attrs.get('endDate')),
-                creation_date=self._parse_date(attrs.get('creationDate'))
-            )
-            records.append(record)
+            metadata = None
+            if 'metadata' in include:
+                metadata = [
+                    (entry.attrib.get('key'), entry.attrib.get('value'))
+                    for entry in record_elem.iterfind('MetadataEntry')
+                ]
+            beats = None
+            if 'beats' in include:
+                beats = [
+                    (beat.attrib.get('bpm'), beat.attrib.get('time'))
+                    for beat in record_elem.iter('InstantaneousBeatsPerMinute')
+                ]
+            yield attrs, metadata, beats
+    
+    @staticmethod
+    def _add_record_metadata(table: RecordMetadata, index: int, entries: List[Tuple[str, str]]) -> None:
+        """Append one record's metadata entries to the side table"""
+        for key, value in entries:
+            table.record_index.append(index)
+            # Keys repeat across millions of records; share one string each
+            table.keys.append(sys.intern(key) if key else key)
+            table.values.append(value)
+    
+    @staticmethod
+    def _add_record_beats(
+        table: InstantaneousBeats,
+        index: int,
+        start_date: Optional[datetime],
+        beats: List[Tuple[str, str]]
+    ) -> None:
+        """Append one record's beat-to-beat readings to the side table"""
+        start = None
+        if start_date is not None:
+            start = start_date.hour * 3600 + start_date.minute * 60 + start_date.second
         
-        return records
+        for bpm, time_string in beats:
+            offset = float('nan')
+            seconds = HealthKitParser._parse_time_of_day(time_string)
+            if seconds is not None and start is not None:
+                # Readings only carry a clock time; wrap across midnight
+                offset = (seconds - start) % 86400
+            table.record_index.append(index)
+            rate = HealthKitParser._parse_float(bpm)
+            table.bpm.append(float('nan') if rate is None else rate)
+            table.offsets.append(offset)
     
-    def parse_workouts(self) -> List[Workout]:
+    def parse_workouts(self, include: Optional[Iterable[str]] = None) -> List[Workout]:
         """
         Parse workout data from the XML file
         
+        Args:
+            include: Optional field groups to read from the Workout's child
+                     elements: 'events', 'statistics', 'metadata' and/or
+                     'route'. Groups not requested are left as None and
+                     their children are never visited.
+        
         Returns:
             List of Workout objects
+        
+        Raises:
+            ValueError: If an unknown field group is requested
         """
+        include = set(include or ())
+        unknown = include.difference(WORKOUT_FIELD_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown workout field groups: {sorted(unknown)}")
+        
         if self.root is None:
             self.load_xml()
         
@@ -109,10 +287,139 @@ class HealthKitParser:
                 start_date=self._parse_date(attrs.get('startDate')),
                 end_date=self._parse_date(attrs.get('endDate'))
             )
+            if include:
+                self._parse_workout_children(workout_elem, workout, include)
             workouts.append(workout)
         
         return workouts
     
+    def load_workout_routes(
+        self,
+        workouts: Iterable[Workout],
+        max_workers: Optional[int] = None,
+        mp_context: Optional['BaseContext'] = None
+    ) -> List[WorkoutRoute]:
+        """
+        Load GPX trackpoints for workouts parsed with include=['route']
+        
+        GPX files are resolved relative to the directory containing
+        export.xml. Routes already loaded are skipped. With max_workers
+        greater than 1 the files are parsed in worker processes, so the
+        calling script needs an ``if __name__ == '__main__':`` guard on
+        platforms that spawn workers (see routes.load_routes).
+        
+        Args:
+            workouts: Workouts whose routes should be loaded
+            max_workers: Number of worker processes (None or 1 parses
+                         the routes in this process)
+            mp_context: Optional multiprocessing context for the workers
+        
+        Returns:
+            List of WorkoutRoute objects that were loaded
+        """
+        from .routes import load_routes
+        
+        export_dir = os.path.dirname(os.path.abspath(self.xml_file_path))
+        routes = [workout.route for workout in workouts if workout.route is not None]
+        return load_routes(routes, export_dir, max_workers=max_workers, mp_context=mp_context)
+    
+    def _parse_workout_children(self, workout_elem: ET.Element, workout: Workout, include: set) -> None:
+        """
+        Fill the requested field groups of a workout from its child elements
+        
+        Args:
+            workout_elem: The Workout XML element
+            workout: Workout object to update
+            include: Field groups to fill
+        """
+        if 'events' in include:
+            workout.events = []
+        if 'statistics' in include:
+            workout.statistics = {}
+        if 'metadata' in include:
+            workout.metadata = {}
+        
+        for child in workout_elem:
+            attrs = child.attrib
+            tag = child.tag
+            
+            if tag == 'WorkoutEvent' and workout.events is not None:
+                workout.events.append(WorkoutEvent(
+                    event_type=attrs.get('type'),
+                    date=self._parse_date(attrs.get('date')),
+                    duration=self._parse_float(attrs.get('duration')),
+                    duration_unit=attrs.get('durationUnit')
+                ))
+            elif tag == 'WorkoutStatistics' and workout.statistics is not None:
+                statistics_type = attrs.get('type')
+                workout.statistics[statistics_type] = WorkoutStatistics(
+                    statistics_type=statistics_type,
+                    unit=attrs.get('unit'),
+                    sum=self._parse_float(attrs.get('sum')),
+                    average=self._parse_float(attrs.get('average')),
+                    minimum=self._parse_float(attrs.get('minimum')),
+                    maximum=self._parse_float(attrs.get('maximum')),
+                    start_date=self._parse_date(attrs.get('startDate')),
+                    end_date=self._parse_date(attrs.get('endDate'))
+                )
+            elif tag == 'MetadataEntry' and workout.metadata is not None:
+                workout.metadata[attrs.get('key')] = attrs.get('value')
+            elif tag == 'WorkoutRoute' and 'route' in include:
+                route = WorkoutRoute(
+                    source_name=attrs.get('sourceName'),
+                    start_date=self._parse_date(attrs.get('startDate')),
+                    end_date=self._parse_date(attrs.get('endDate'))
+                )
+                for route_child in child:
+                    if route_child.tag == 'FileReference':
+                        route.file_path = route_child.attrib.get('path')
+                    elif route_child.tag == 'MetadataEntry':
+                        route.metadata[route_child.attrib.get('key')] = route_child.attrib.get('value')
+                workout.route = route
+    
+    def iter_activity_summaries(self) -> Iterator[ActivitySummary]:
+        """
+        Iterate over daily activity ring summaries in the XML file
+
+        The file is streamed, skipping every other element, unless the
+        tree was already loaded with load_xml().
+
+        Yields:
+            ActivitySummary objects, in file order
+        """
+        if self.root is None:
+            summaries = iter_root_elements(self.xml_file_path, 'ActivitySummary')
+        else:
+            # ActivitySummary elements are direct children of HealthData
+            summaries = (elem.attrib for elem in self.root.iterfind('ActivitySummary'))
+
+        for attrs in summaries:
+            date = self._parse_day(attrs.get('dateComponents'))
+            if date is None:
+                continue
+
+            yield ActivitySummary(
+                date=date,
+                active_energy_burned=self._parse_float(attrs.get('activeEnergyBurned')) or 0.0,
+                apple_exercise_time=self._parse_float(attrs.get('appleExerciseTime')) or 0.0,
+                apple_stand_hours=int(self._parse_float(attrs.get('appleStandHours')) or 0),
+                active_energy_burned_goal=self._parse_float(attrs.get('activeEnergyBurnedGoal')),
+                active_energy_burned_unit=attrs.get('activeEnergyBurnedUnit'),
+                apple_move_time=self._parse_float(attrs.get('appleMoveTime')),
+                apple_move_time_goal=self._parse_float(attrs.get('appleMoveTimeGoal')),
+                apple_exercise_time_goal=self._parse_float(attrs.get('appleExerciseTimeGoal')),
+                apple_stand_hours_goal=self._parse_int(attrs.get('appleStandHoursGoal'))
+            )
+
+    def parse_activity_summaries(self) -> ActivitySummaryTable:
+        """
+        Parse daily activity ring summaries into a date-indexed table
+
+        Returns:
+            ActivitySummaryTable with one row per day
+        """
+        return ActivitySummaryTable(self.iter_activity_summaries())
+
     def get_record_types(self) -> List[str]:
         """
         Get a list of all unique record types in the XML file
@@ -134,20 +441,73 @@ class HealthKitParser:
     @staticmethod
     def _parse_date(date_string: Optional[str]) -> Optional[datetime]:
         """
-        Parse ISO format date string to datetime object
+        Parse ISO format date string to datetime object (see parse_date)
+        """
+        return parse_date(date_string)
+
+    @staticmethod
+    def _parse_day(date_string: Optional[str]) -> Optional[datetime]:
+        """
+        Parse a 'YYYY-MM-DD' date string (as used by ActivitySummary)
+
+        Args:
+            date_string: Date string without a time component
+
+        Returns:
+            datetime at midnight or None if parsing fails
+        """
+        if not date_string:
+            return None
+
+        try:
+            return datetime.strptime(date_string, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _parse_float(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a numeric attribute, returning None if missing or invalid
+        """
+        if value is None:
+            return None
+
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_int(value: Optional[str]) -> Optional[int]:
+        """
+        Parse an integer attribute, returning None if missing or invalid
+        """
+        number = HealthKitParser._parse_float(value)
+        return None if number is None else int(number)
+    
+    @staticmethod
+    def _parse_time_of_day(time_string: Optional[str]) -> Optional[float]:
+        """
+        Parse a clock time such as '7:42:12.34 PM' or '19:42:12.34'
         
         Args:
-            date_string: ISO format date string
+            time_string: Time of day, in 12- or 24-hour format
         
         Returns:
-            datetime object or None if parsing fails
+            Seconds since midnight or None if parsing fails
         """
-        if not date_string:
+        if not time_string:
             return None
         
         try:
-            # Apple Health uses ISO 8601 format with timezone
-            # Example: "2024-02-15 10:30:00 -0500"
-            return datetime.fromisoformat(date_string.replace(' ', 'T', 1))
-        except (ValueError, AttributeError):
-            return None
\ No newline at end of file
+            clock, _, meridiem = time_string.strip().partition(' ')
+            hours, minutes, seconds = clock.split(':')
+            hours = int(hours)
+            meridiem = meridiem.upper()
+            if meridiem == 'PM' and hours != 12:
+                hours += 12
+            elif meridiem == 'AM' and hours == 12:
+                hours = 0
+            return hours * 3600 + int(minutes) * 60 + float(seconds)
+        except ValueError:
+            return None
@@ -0,0 +1,308 @@
+"""
+Checkpointed, resumable parsing of large export.xml files
+
+A ResumableParse streams records into a sink and periodically writes a
+checkpoint holding the byte offset to resume from, the number of records
+emitted so far and the sink's state at that point. Sinks commit their
+output before each checkpoint and roll back to the checkpointed state
+when a parse resumes, so records written after the last checkpoint are
+discarded and parsed again rather than duplicated.
+"""
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from .models import HealthRecord
+from .stream import RecordStream
+
+
+CHECKPOINT_VERSION = 1
+
+
+class RecordSink(ABC):
+    """
+    Destination for records produced by a resumable parse
+
+    Subclasses implement write(), commit() and restore(); a subclass
+    missing one of them cannot be instantiated.
+    """
+
+    @abstractmethod
+    def restore(self, state: Optional[Dict[str, Any]]) -> None:
+        """
+        Prepare the sink before parsing starts or resumes
+
+        Args:
+            state: State returned by commit() at the checkpoint being
+                   resumed from, or None when starting from scratch
+        """
+
+    @abstractmethod
+    def write(self, records: List[HealthRecord]) -> None:
+        """
+        Append a batch of records
+        """
+
+    @abstractmethod
+    def commit(self) -> Dict[str, Any]:
+        """
+        Make everything written so far durable
+
+        Returns:
+            JSON-serializable state to store in the checkpoint
+        """
+
+    def close(self) -> None:
+        """
+        Release any resources held by the sink
+        """
+
+
+class CsvSink(RecordSink):
+    """
+    Writes records to a CSV file, one row per record
+
+    The sink state is the committed file size. Resuming truncates the
+    file back to that size, dropping rows written after the checkpoint.
+    """
+
+    HEADER = ['type', 'source', 'value', 'unit', 'start_date', 'end_date', 'creation_date']
+
+    def __init__(self, csv_file_path: str):
+        """
+        Args:
+            csv_file_path: Path of the output CSV file
+        """
+        self.csv_file_path = csv_file_path
+        self._file = None
+        self._writer = None
+
+    def restore(self, state: Optional[Dict[str, Any]]) -> None:
+        """
+        Truncate the file to its checkpointed size, or start a new file
+
+        Raises:
+            ValueError: If resuming and the output file is missing or
+                        shorter than at the checkpoint
+        """
+        self.close()
+        if state is None:
+            self._file = open(self.csv_file_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.HEADER)
+            return
+
+        size = state['size']
+        if not os.path.exists(self.csv_file_path) or os.path.getsize(self.csv_file_path) < size:
+            raise ValueError(f"Output does not match checkpoint: {self.csv_file_path}")
+        os.truncate(self.csv_file_path, size)
+        self._file = open(self.csv_file_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+
+    def write(self, records: List[HealthRecord]) -> None:
+        """Append records as CSV rows"""
+        self._writer.writerows(
+            [
+                record.record_type,
+                record.source_name,
+                record.value,
+                record.unit,
+                _isoformat(record.start_date),
+                _isoformat(record.end_date),
+                _isoformat(record.creation_date)
+            ]
+            for record in records
+        )
+
+    def commit(self) -> Dict[str, Any]:
+        """Flush and fsync the file, returning its size"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'size': os.fstat(self._file.fileno()).st_size}
+
+    def close(self) -> None:
+        """Close the output file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of a resumable parse
+
+    Attributes:
+        xml_file_path: Absolute path of the export being parsed
+        file_size: Size of the export, to detect a replaced file
+        file_mtime_ns: Modification time of the export, in nanoseconds
+        record_type: Record type filter of the parse
+        root_offset: Byte offset of the root start tag
+        root_name: Name of the root element
+        offset: Byte offset to resume parsing from
+        records: Number of records written to the sink before offset
+        sink_state: Sink state returned by commit() at this checkpoint
+        complete: Whether the parse has finished
+    """
+    xml_file_path: str
+    file_size: int
+    file_mtime_ns: int
+    record_type: Optional[str] = None
+    root_offset: int = 0
+    root_name: str = 'HealthData'
+    offset: int = 0
+    records: int = 0
+    sink_state: Optional[Dict[str, Any]] = None
+    complete: bool = False
+    version: int = field(default=CHECKPOINT_VERSION)
+
+    def matches(self, other: 'Checkpoint') -> bool:
+        """Whether two checkpoints describe the same parse of the same file"""
+        return (self.version, self.xml_file_path, self.file_size,
+                self.file_mtime_ns, self.record_type) == (
+            other.version, other.xml_file_path, other.file_size,
+            other.file_mtime_ns, other.record_type)
+
+
+def save_checkpoint(checkpoint: Checkpoint, checkpoint_path: str) -> None:
+    """
+    Atomically write a checkpoint file
+
+    The checkpoint is written to a temporary file, synced, then renamed
+    over the previous one, so a crash never leaves a partial checkpoint.
+    """
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as temp_file:
+        json.dump(asdict(checkpoint), temp_file)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, checkpoint_path)
+
+
+def load_checkpoint(checkpoint_path: str) -> Optional[Checkpoint]:
+    """
+    Read a checkpoint file
+
+    Returns:
+        Checkpoint, or None if the file doesn't exist
+    """
+    try:
+        with open(checkpoint_path, encoding='utf-8') as checkpoint_file:
+            return Checkpoint(**json.load(checkpoint_file))
+    except FileNotFoundError:
+        return None
+
+
+class ResumableParse:
+    """
+    Streams records into a sink with periodic checkpoints
+
+    Usage:
+        parse = ResumableParse('export.xml', CsvSink('records.csv'), 'export.ckpt')
+        total = parse.run()  # run again after a crash to resume
+    """
+
+    def __init__(
+        self,
+        xml_file_path: str,
+        sink: RecordSink,
+        checkpoint_path: str,
+        record_type: Optional[str] = None,
+        checkpoint_every: int = 100000,
+        batch_size: int = 1000
+    ):
+        """
+        Args:
+            xml_file_path: Path to the Apple Health export.xml file
+            sink: Destination for records
+            checkpoint_path: Path of the JSON checkpoint file
+            record_type: Optional filter for specific record type
+            checkpoint_every: Number of records between checkpoints
+            batch_size: Number of records passed to sink.write() at a time
+        """
+        self.xml_file_path = xml_file_path
+        self.sink = sink
+        self.checkpoint_path = checkpoint_path
+        self.record_type = record_type
+        self.checkpoint_every = checkpoint_every
+        self.batch_size = batch_size
+
+    def run(self) -> int:
+        """
+        Parse from the last checkpoint (or the start) to the end
+
+        A checkpoint for a different file, a modified file or a different
+        record type is ignored and the parse starts from scratch.
+
+        Returns:
+            Total number of records written to the sink
+        """
+        from .parser import build_record
+
+        stat = os.stat(self.xml_file_path)
+        fresh = Checkpoint(
+            xml_file_path=os.path.abspath(self.xml_file_path),
+            file_size=stat.st_size,
+            file_mtime_ns=stat.st_mtime_ns,
+            record_type=self.record_type
+        )
+        checkpoint = load_checkpoint(self.checkpoint_path)
+        if checkpoint is None or not checkpoint.matches(fresh):
+            checkpoint = fresh
+        if checkpoint.complete:
+            return checkpoint.records
+
+        try:
+            self.sink.restore(checkpoint.sink_state)
+            stream = RecordStream(
+                self.xml_file_path,
+                record_type=self.record_type,
+                start_offset=checkpoint.offset,
+                root_offset=checkpoint.root_offset,
+                root_name=checkpoint.root_name
+            )
+
+            count = checkpoint.records
+            since_checkpoint = 0
+            batch: List[HealthRecord] = []
+            for offset, (attrs, _, _) in stream.iter_with_offsets():
+                if offset is not None and since_checkpoint >= self.checkpoint_every:
+                    # Everything before offset has been emitted: make it durable
+                    if batch:
+                        self.sink.write(batch)
+                        batch = []
+                    checkpoint.offset = offset
+                    checkpoint.records = count
+                    checkpoint.root_offset = stream.root_offset
+                    checkpoint.root_name = stream.root_name
+                    checkpoint.sink_state = self.sink.commit()
+                    save_checkpoint(checkpoint, self.checkpoint_path)
+                    since_checkpoint = 0
+
+                batch.append(build_record(attrs))
+                count += 1
+                since_checkpoint += 1
+                if len(batch) >= self.batch_size:
+                    self.sink.write(batch)
+                    batch = []
+
+            if batch:
+                self.sink.write(batch)
+            checkpoint.offset = stat.st_size
+            checkpoint.records = count
+            checkpoint.sink_state = self.sink.commit()
+            checkpoint.complete = True
+            save_checkpoint(checkpoint, self.checkpoint_path)
+        finally:
+            self.sink.close()
+
+        return count
+
+
+def _isoformat(moment) -> str:
+    """ISO format for an optional datetime"""
+    return '' if moment is None else moment.isoformat()
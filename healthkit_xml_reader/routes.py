@@ -0,0 +1,170 @@
+"""
+Loading of workout route GPX files referenced by the export
+"""
+
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing.context import BaseContext
+from typing import Iterable, List, Optional, Tuple
+from .models import RouteTrack, WorkoutRoute
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_timestamp(time_string: Optional[str]) -> float:
+    """
+    Parse a GPX time string to a POSIX timestamp
+
+    Args:
+        time_string: ISO 8601 time string (e.g., '2024-02-15T13:30:00Z')
+
+    Returns:
+        POSIX timestamp, or NaN if missing or invalid
+    """
+    if not time_string:
+        return float('nan')
+
+    try:
+        return datetime.fromisoformat(time_string.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return float('nan')
+
+
+def resolve_route_path(route: WorkoutRoute, export_dir: str) -> str:
+    """
+    Resolve a route's GPX path against the export directory
+
+    The export references routes as '/workout-routes/route_....gpx',
+    relative to the directory that contains export.xml.
+
+    Args:
+        route: WorkoutRoute with a file_path
+        export_dir: Directory containing export.xml
+
+    Returns:
+        Filesystem path to the GPX file
+    """
+    return os.path.join(export_dir, route.file_path.lstrip('/'))
+
+
+def parse_gpx(gpx_file_path: str) -> RouteTrack:
+    """
+    Parse a GPX file into a compact RouteTrack
+
+    Trackpoints are streamed and removed from their track segment as
+    they are read, so memory use is bounded by the output arrays.
+
+    Args:
+        gpx_file_path: Path to the GPX file
+
+    Returns:
+        RouteTrack with one entry per trackpoint
+
+    Raises:
+        FileNotFoundError: If the GPX file doesn't exist
+        ET.ParseError: If the GPX file is malformed
+    """
+    track = RouteTrack()
+    segment = None
+
+    for event, elem in ET.iterparse(gpx_file_path, events=('start', 'end')):
+        name = _local_name(elem.tag)
+        if event == 'start':
+            if name == 'trkseg':
+                segment = elem
+            continue
+        if name == 'trkseg':
+            segment = None
+        if name != 'trkpt':
+            continue
+
+        elevation = float('nan')
+        timestamp = float('nan')
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == 'ele' and child.text:
+                elevation = float(child.text)
+            elif name == 'time':
+                timestamp = _parse_timestamp(child.text)
+
+        track.latitudes.append(float(elem.attrib['lat']))
+        track.longitudes.append(float(elem.attrib['lon']))
+        track.elevations.append(elevation)
+        track.timestamps.append(timestamp)
+        # Detach the trackpoint so finished points don't pile up in the tree
+        if segment is not None:
+            segment.remove(elem)
+        else:
+            elem.clear()
+
+    return track
+
+
+def _parse_gpx_arrays(gpx_file_path: str) -> Tuple[array, array, array, array]:
+    """
+    Parse a GPX file in a worker process
+
+    Returns:
+        Latitude, longitude, elevation and timestamp arrays
+    """
+    track = parse_gpx(gpx_file_path)
+    return track.latitudes, track.longitudes, track.elevations, track.timestamps
+
+
+def load_routes(
+    routes: Iterable[WorkoutRoute],
+    export_dir: str,
+    max_workers: Optional[int] = None,
+    mp_context: Optional[BaseContext] = None
+) -> List[WorkoutRoute]:
+    """
+    Load the trackpoints of several routes
+
+    Routes are parsed in this process by default. GPX parsing is
+    CPU-bound Python code, so with max_workers greater than 1 the routes
+    are parsed in that many worker processes instead, and only the
+    trackpoint arrays are sent back.
+
+    Worker processes are started with the platform's default method
+    (or mp_context). With "spawn" (macOS, Windows) and "forkserver"
+    (Linux from Python 3.14), each worker re-imports the main module,
+    so a script using worker processes must call this function under an
+    ``if __name__ == '__main__':`` guard.
+
+    Routes that are already loaded or have no file reference are left
+    untouched. Each loaded route gets its ``track`` attribute set.
+
+    Args:
+        routes: WorkoutRoute objects to load
+        export_dir: Directory containing export.xml
+        max_workers: Number of worker processes (None or 1 parses the
+                     routes in this process)
+        mp_context: Optional multiprocessing context for the workers
+
+    Returns:
+        The routes that were loaded
+    """
+    pending = [
+        route for route in routes
+        if route.track is None and route.file_path
+    ]
+    if not pending:
+        return []
+
+    paths = [resolve_route_path(route, export_dir) for route in pending]
+    if max_workers is None or max_workers <= 1 or len(paths) == 1:
+        for route, path in zip(pending, paths):
+            route.track = parse_gpx(path)
+        return pending
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        for route, arrays in zip(pending, executor.map(_parse_gpx_arrays, paths)):
+            route.track = RouteTrack(*arrays)
+
+    return pending
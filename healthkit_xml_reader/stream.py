@@ -0,0 +1,276 @@
+"""
+Streaming scanner for Record elements in large export.xml files
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.parsers import expat
+
+
+# (record attributes, metadata (key, value) pairs, beats (bpm, time) pairs)
+RecordItem = Tuple[Dict[str, str], Optional[List[Tuple[str, str]]], Optional[List[Tuple[str, str]]]]
+
+
+class RecordStream:
+    """
+    Streams Record elements from an export.xml file using expat
+
+    No element tree is built. Children of a Record are only looked at
+    when metadata or beat-to-beat data was requested. Otherwise (and for
+    records filtered out by type) the start-element handler is removed
+    until the closing Record tag, so expat skips the subtree without
+    building attribute dicts or calling back into Python for it.
+
+    The stream can also start part-way through a file: given the byte
+    offset of an element directly under the root, it replays the file's
+    prolog and root start tag, then continues from that offset.
+
+    Usage:
+        for attrs, metadata, beats in RecordStream('export.xml'):
+            print(attrs['type'])
+    """
+
+    def __init__(
+        self,
+        xml_file_path: str,
+        record_type: Optional[str] = None,
+        include_metadata: bool = False,
+        include_beats: bool = False,
+        chunk_size: int = 1 << 20,
+        start_offset: int = 0,
+        root_offset: int = 0,
+        root_name: str = 'HealthData'
+    ):
+        """
+        Initialize the stream
+
+        Args:
+            xml_file_path: Path to the Apple Health export.xml file
+            record_type: Optional filter for a specific record type
+            include_metadata: Collect MetadataEntry children of each record
+            include_beats: Collect InstantaneousBeatsPerMinute descendants
+            chunk_size: Number of bytes fed to expat at a time
+            start_offset: Byte offset to resume from. Must be a resume
+                          offset reported by iter_with_offsets().
+            root_offset: Byte offset of the root start tag (only used
+                         when start_offset is set)
+            root_name: Name of the root element (only used when
+                       start_offset is set)
+        """
+        self.xml_file_path = xml_file_path
+        self.record_type = record_type
+        self.include_metadata = include_metadata
+        self.include_beats = include_beats
+        self.chunk_size = chunk_size
+        self.start_offset = start_offset
+        self.root_offset = root_offset
+        self.root_name = root_name
+
+        self._parser = None
+        self._base = 0
+        self._level = 0
+        self._pending: List[Tuple[Optional[int], RecordItem]] = []
+        self._attrs: Optional[Dict[str, str]] = None
+        self._metadata: Optional[List[Tuple[str, str]]] = None
+        self._beats: Optional[List[Tuple[str, str]]] = None
+        self._offset: Optional[int] = None
+        self._depth = 0
+        self._emit = False
+
+    def __iter__(self) -> Iterator[RecordItem]:
+        """
+        Yield (attributes, metadata, beats) for each matching record
+
+        metadata and beats are None unless requested.
+
+        Raises:
+            FileNotFoundError: If XML file doesn't exist
+            ET.ParseError: If XML is malformed
+        """
+        for _, item in self.iter_with_offsets():
+            yield item
+
+    def iter_with_offsets(self) -> Iterator[Tuple[Optional[int], RecordItem]]:
+        """
+        Yield (offset, item) for each matching record
+
+        offset is the byte offset of the record's start tag when the
+        record sits directly under the root element, and None otherwise
+        (e.g., for records inside a Correlation). Every record before a
+        non-None offset has already been yielded, so it is a safe point
+        to resume from with start_offset.
+
+        Raises:
+            FileNotFoundError: If XML file doesn't exist
+            ET.ParseError: If XML is malformed
+        """
+        self._parser = expat.ParserCreate()
+        self._parser.StartElementHandler = self._start_root
+        self._level = 0
+
+        try:
+            xml_file = open(self.xml_file_path, 'rb')
+        except FileNotFoundError:
+            raise FileNotFoundError(f"XML file not found: {self.xml_file_path}")
+
+        with xml_file:
+            if self.start_offset:
+                prolog = xml_file.read(self.root_offset)
+                prolog += f'<{self.root_name}>'.encode('utf-8')
+                self._base = self.start_offset - len(prolog)
+                self._feed(prolog)
+                xml_file.seek(self.start_offset)
+            else:
+                self._base = 0
+
+            while True:
+                chunk = xml_file.read(self.chunk_size)
+                self._feed(chunk)
+
+                if self._pending:
+                    yield from self._pending
+                    self._pending.clear()
+                if not chunk:
+                    break
+
+    def _feed(self, data: bytes) -> None:
+        """Feed bytes to expat; empty data ends the document"""
+        try:
+            self._parser.Parse(data, not data)
+        except expat.ExpatError as e:
+            raise ET.ParseError(f"Failed to parse XML: {e}")
+
+    def _start_root(self, name: str, attrs: Dict[str, str]) -> None:
+        if not self.start_offset:
+            self.root_offset = self._parser.CurrentByteIndex
+            self.root_name = name
+        self._level = 1
+        self._outside()
+
+    def _outside(self) -> None:
+        """Switch to the handlers used between records"""
+        self._parser.StartElementHandler = self._start_outside
+        self._parser.EndElementHandler = self._end_outside
+
+    def _start_outside(self, name: str, attrs: Dict[str, str]) -> None:
+        if name != 'Record':
+            self._level += 1
+            return
+
+        if self.record_type and attrs.get('type') != self.record_type:
+            self._skip(emit=False)
+            return
+
+        self._attrs = attrs
+        self._metadata = [] if self.include_metadata else None
+        self._beats = [] if self.include_beats else None
+        self._offset = None
+        if self._level == 1:
+            self._offset = self._parser.CurrentByteIndex + self._base
+        if self.include_metadata or self.include_beats:
+            self._depth = 1
+            self._parser.StartElementHandler = self._start_inside
+            self._parser.EndElementHandler = self._end_inside
+        else:
+            self._skip(emit=True)
+
+    def _end_outside(self, name: str) -> None:
+        self._level -= 1
+
+    def _skip(self, emit: bool) -> None:
+        """Ignore everything up to the end of the current record"""
+        self._emit = emit
+        self._parser.StartElementHandler = None
+        self._parser.EndElementHandler = self._end_skip
+
+    def _end_skip(self, name: str) -> None:
+        # Records never nest, so the first closing Record tag is ours
+        if name == 'Record':
+            if self._emit:
+                self._finish()
+            self._outside()
+
+    def _start_inside(self, name: str, attrs: Dict[str, str]) -> None:
+        self._depth += 1
+        if name == 'MetadataEntry':
+            if self._metadata is not None and self._depth == 2:
+                self._metadata.append((attrs.get('key'), attrs.get('value')))
+        elif name == 'InstantaneousBeatsPerMinute':
+            if self._beats is not None:
+                self._beats.append((attrs.get('bpm'), attrs.get('time')))
+
+    def _end_inside(self, name: str) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._finish()
+            self._outside()
+
+    def _finish(self) -> None:
+        """Queue the record that just ended"""
+        self._pending.append((self._offset, (self._attrs, self._metadata, self._beats)))
+        self._attrs = self._metadata = self._beats = None
+
+
+def iter_root_elements(
+    xml_file_path: str,
+    name: str,
+    chunk_size: int = 1 << 20
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield the attributes of elements with a given name directly under the root
+
+    Like RecordStream, no element tree is built: the start-element handler
+    is removed inside every other top-level element until its closing tag,
+    so expat skips those subtrees without building attribute dicts.
+
+    Args:
+        xml_file_path: Path to the Apple Health export.xml file
+        name: Element name to look for (e.g., 'ActivitySummary')
+        chunk_size: Number of bytes fed to expat at a time
+
+    Raises:
+        FileNotFoundError: If XML file doesn't exist
+        ET.ParseError: If XML is malformed
+    """
+    parser = expat.ParserCreate()
+    pending: List[Dict[str, str]] = []
+    skipping: List[str] = []
+
+    def start_root(tag: str, attrs: Dict[str, str]) -> None:
+        parser.StartElementHandler = start_child
+
+    def start_child(tag: str, attrs: Dict[str, str]) -> None:
+        if tag == name:
+            pending.append(attrs)
+        # Top-level elements never nest, so the first matching end tag
+        # closes the element being skipped
+        skipping.append(tag)
+        parser.StartElementHandler = None
+        parser.EndElementHandler = end_skip
+
+    def end_skip(tag: str) -> None:
+        if tag == skipping[-1]:
+            skipping.pop()
+            parser.StartElementHandler = start_child
+            parser.EndElementHandler = None
+
+    parser.StartElementHandler = start_root
+
+    try:
+        xml_file = open(xml_file_path, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    with xml_file:
+        while True:
+            chunk = xml_file.read(chunk_size)
+            try:
+                parser.Parse(chunk, not chunk)
+            except expat.ExpatError as e:
+                raise ET.ParseError(f"Failed to parse XML: {e}")
+
+            if pending:
+                yield from pending
+                pending.clear()
+            if not chunk:
+                break
@@ -0,0 +1,820 @@
+"""
+Compressed time-series encoding for health records
+
+High-frequency metrics (HeartRate, ActiveEnergyBurned, ...) are stored
+per (record type, unit) as a sequence of independently decodable blocks:
+
+- start times as delta-of-delta varints (regular sampling costs ~1 byte)
+- end times as small offsets from start, creation times as offsets
+  from end (or from start for records without an end date)
+- values quantized to fixed-point integers and delta-coded when they are
+  plain decimals, XOR-coded float64 otherwise, and dictionary-coded
+  when they are not numeric (e.g., category values)
+- source names and UTC offsets dictionary-coded per series, with one
+  UTC offset column per date so each date keeps its own offset
+- integer columns run-length coded when that is smaller
+
+Each block header carries its time range and payload length, so range
+queries skip whole blocks without decoding them, and load() can seek
+past them without reading them. The same bytes are used for persisted
+snapshots (dump/load) and for transfer between workers (dumps/loads).
+
+Records are added to a SeriesBuilder one at a time and held as compact
+integer columns until build(), so compressing an export never needs a
+list of HealthRecord objects for the whole file (see compress_export).
+
+Times are stored with one-second resolution, as in export.xml. Values
+round-trip numerically; redundant zeros are dropped from their text
+(e.g., '60.0' decodes as '60').
+"""
+
+import io
+import re
+import struct
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import HealthRecord
+
+
+MAGIC = b'HKTS'
+VERSION = 2
+
+COLUMN_PLAIN = 0
+COLUMN_RUNS = 1
+
+VALUES_QUANTIZED = 0
+VALUES_XOR = 1
+VALUES_STRINGS = 2
+
+# Plain decimals with more digits than this are XOR-coded instead
+MAX_DECIMALS = 6
+
+_DECIMAL = re.compile(r'([+-]?)([0-9]*)(?:\.([0-9]*))?$')
+_FLOAT = struct.Struct('>d')
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class Block:
+    """
+    One independently decodable block of a compressed series
+
+    Attributes:
+        first: Start timestamp of the first record (POSIX seconds)
+        last: Start timestamp of the last record (POSIX seconds)
+        count: Number of records in the block
+        payload: Encoded record data
+    """
+    first: int
+    last: int
+    count: int
+    payload: bytes
+
+
+@dataclass
+class CompressedSeries:
+    """
+    Compressed records of a single record type and unit
+
+    Usage:
+        series = compress_records(parser.parse_records())
+        data = dumps(series)
+        for record in loads(data)[0].iter_range(start, end):
+            print(record.value)
+
+    Attributes:
+        record_type: Record type shared by every record in the series
+        unit: Unit shared by every record in the series
+        sources: Source name dictionary
+        utc_offsets: UTC offset dictionary, in minutes (None for naive times)
+        blocks: Encoded blocks in time order
+    """
+    record_type: str
+    unit: Optional[str]
+    sources: List[Optional[str]] = field(default_factory=list)
+    utc_offsets: List[Optional[int]] = field(default_factory=list)
+    blocks: List[Block] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        """Number of records in the series"""
+        return sum(block.count for block in self.blocks)
+
+    def __iter__(self) -> Iterator[HealthRecord]:
+        """Decode every record, in start time order"""
+        for block in self.blocks:
+            yield from self._decode_block(block)
+
+    def __repr__(self) -> str:
+        """String representation of the series"""
+        return (f"CompressedSeries(type={self.record_type}, "
+                f"records={len(self)}, blocks={len(self.blocks)})")
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the encoded block payloads"""
+        return sum(len(block.payload) for block in self.blocks)
+
+    def iter_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[HealthRecord]:
+        """
+        Decode records whose start date falls within [start, end]
+
+        Blocks entirely outside the range are skipped without decoding.
+
+        Args:
+            start: Earliest start date to include (None for no limit)
+            end: Latest start date to include (None for no limit)
+        """
+        lo = None if start is None else _timestamp(start)
+        hi = None if end is None else _timestamp(end)
+
+        for block in self.blocks:
+            if (lo is not None and block.last < lo) or (hi is not None and block.first > hi):
+                continue
+            if (lo is None or block.first >= lo) and (hi is None or block.last <= hi):
+                yield from self._decode_block(block)
+                continue
+            for timestamp, record in zip(_block_timestamps(block), self._decode_block(block)):
+                if (lo is None or timestamp >= lo) and (hi is None or timestamp <= hi):
+                    yield record
+
+    def _decode_block(self, block: Block) -> Iterator[HealthRecord]:
+        """Decode the records of one block"""
+        data = block.payload
+        count = block.count
+        timestamps = _block_timestamps(block)
+        pos = _timestamps_size(block)
+
+        end_offsets, pos = _read_optional_offsets(data, pos, count)
+        creation_offsets, pos = _read_optional_offsets(data, pos, count)
+        source_codes, pos = _decode_column(data, pos, count)
+        start_zones, pos = _decode_column(data, pos, count)
+        end_zones, pos = _decode_column(data, pos, count)
+        creation_zones, pos = _decode_column(data, pos, count)
+        values, pos = _decode_values(data, pos, count)
+
+        zones = [_zone(offset) for offset in self.utc_offsets]
+        sources = self.sources
+        for i in range(count):
+            start = timestamps[i]
+            end = None if end_offsets[i] is None else start + end_offsets[i]
+            creation = None
+            if creation_offsets[i] is not None:
+                creation = (start if end is None else end) + creation_offsets[i]
+            yield HealthRecord(
+                record_type=self.record_type,
+                source_name=sources[source_codes[i]],
+                value=values[i],
+                unit=self.unit,
+                start_date=_to_datetime(start, zones[start_zones[i]]),
+                end_date=None if end is None else _to_datetime(end, zones[end_zones[i]]),
+                creation_date=None if creation is None else _to_datetime(
+                    creation, zones[creation_zones[i]])
+            )
+
+
+class _SeriesBuffer:
+    """
+    Rows of one series waiting to be encoded, held as compact columns
+
+    Offsets are stored as they are encoded (zigzag + 1, 0 for missing)
+    and values as codes into a table of distinct value strings.
+    """
+
+    def __init__(self, series: CompressedSeries):
+        self.series = series
+        self.starts = array('q')
+        self.end_offsets = array('Q')
+        self.creation_offsets = array('Q')
+        self.sources = array('l')
+        self.start_zones = array('l')
+        self.end_zones = array('l')
+        self.creation_zones = array('l')
+        self.values = array('l')
+        self.value_table: List[Optional[str]] = []
+        self.source_codes: Dict[Optional[str], int] = {}
+        self.zone_codes: Dict[Optional[int], int] = {}
+        self.value_codes: Dict[Optional[str], int] = {}
+        self.in_order = True
+
+    def row(self, i: int) -> tuple:
+        """Row i as (start, end offset, creation offset, source, zones..., value)"""
+        return (
+            self.starts[i],
+            self.end_offsets[i],
+            self.creation_offsets[i],
+            self.sources[i],
+            self.start_zones[i],
+            self.end_zones[i],
+            self.creation_zones[i],
+            self.value_table[self.values[i]]
+        )
+
+
+class SeriesBuilder:
+    """
+    Accumulates records and compresses them into series
+
+    Usage:
+        builder = SeriesBuilder()
+        for record in records:
+            builder.add(record)
+        series_list = builder.build()
+    """
+
+    def __init__(self, block_size: int = 1024):
+        """
+        Args:
+            block_size: Maximum number of records per block
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.block_size = block_size
+        self._buffers: Dict[Tuple[str, Optional[str]], _SeriesBuffer] = {}
+
+    def add(self, record: HealthRecord) -> None:
+        """Add one HealthRecord"""
+        self.add_fields(
+            record.record_type,
+            record.source_name,
+            record.value,
+            record.unit,
+            record.start_date,
+            record.end_date,
+            record.creation_date
+        )
+
+    def add_fields(
+        self,
+        record_type: str,
+        source_name: Optional[str],
+        value: Optional[str],
+        unit: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime] = None,
+        creation_date: Optional[datetime] = None
+    ) -> None:
+        """
+        Add one record given as separate fields
+
+        Records without a start date cannot be placed in time and are
+        skipped.
+        """
+        if start_date is None:
+            return
+
+        key = (record_type, unit)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _SeriesBuffer(
+                CompressedSeries(record_type=record_type, unit=unit))
+        series = buffer.series
+
+        start = _timestamp(start_date)
+        start_zone = _code(buffer.zone_codes, series.utc_offsets, _utc_offset(start_date))
+        end = end_zone = None
+        if end_date is not None:
+            end = _timestamp(end_date)
+            end_zone = _code(buffer.zone_codes, series.utc_offsets, _utc_offset(end_date))
+        creation = creation_zone = None
+        if creation_date is not None:
+            # Relative to end when there is one, otherwise to start
+            creation = _timestamp(creation_date) - (start if end is None else end)
+            creation_zone = _code(buffer.zone_codes, series.utc_offsets, _utc_offset(creation_date))
+
+        if buffer.starts and start < buffer.starts[-1]:
+            buffer.in_order = False
+        buffer.starts.append(start)
+        buffer.end_offsets.append(0 if end is None else _zigzag(end - start) + 1)
+        buffer.creation_offsets.append(0 if creation is None else _zigzag(creation) + 1)
+        buffer.sources.append(_code(buffer.source_codes, series.sources, source_name))
+        # Missing dates reuse the start zone so run-length coding stays effective
+        buffer.start_zones.append(start_zone)
+        buffer.end_zones.append(start_zone if end_zone is None else end_zone)
+        buffer.creation_zones.append(start_zone if creation_zone is None else creation_zone)
+        buffer.values.append(_code(buffer.value_codes, buffer.value_table, value))
+
+    def build(self) -> List[CompressedSeries]:
+        """
+        Encode everything added so far and reset the builder
+
+        Records are sorted by start date within each series. Each
+        series' buffered columns are released as soon as it is encoded.
+
+        Returns:
+            List of CompressedSeries, ordered by record type and unit
+        """
+        buffers, self._buffers = self._buffers, {}
+        series_list = []
+        for key in sorted(buffers, key=lambda key: (key[0] or '', key[1] or '')):
+            buffer = buffers.pop(key)
+            order = range(len(buffer.starts))
+            if not buffer.in_order:
+                order = sorted(order, key=buffer.starts.__getitem__)
+
+            size = self.block_size
+            for i in range(0, len(order), size):
+                buffer.series.blocks.append(
+                    _encode_block([buffer.row(j) for j in order[i:i + size]]))
+            series_list.append(buffer.series)
+
+        return series_list
+
+
+def compress_records(records: Iterable[HealthRecord], block_size: int = 1024) -> List[CompressedSeries]:
+    """
+    Compress records into one series per (record type, unit)
+
+    Records are sorted by start date within each series. Records without
+    a start date cannot be placed in time and are skipped.
+
+    Records are consumed one at a time, so passing a generator keeps
+    only the compact builder columns in memory.
+
+    Args:
+        records: HealthRecord objects, in any order
+        block_size: Maximum number of records per block
+
+    Returns:
+        List of CompressedSeries, ordered by record type and unit
+    """
+    builder = SeriesBuilder(block_size)
+    for record in records:
+        builder.add(record)
+    return builder.build()
+
+
+def compress_export(
+    xml_file_path: str,
+    record_type: Optional[str] = None,
+    block_size: int = 1024
+) -> List[CompressedSeries]:
+    """
+    Stream an export's records straight into compressed series
+
+    Record attributes go from the streaming scanner into the builder's
+    compact columns without creating HealthRecord objects, so peak
+    memory stays well below that of parse_records() on the same file.
+
+    Args:
+        xml_file_path: Path to the Apple Health export.xml file
+        record_type: Optional filter for specific record type
+        block_size: Maximum number of records per block
+
+    Returns:
+        List of CompressedSeries, ordered by record type and unit
+    """
+    from .parser import parse_date
+    from .stream import RecordStream
+
+    builder = SeriesBuilder(block_size)
+    for attrs, _, _ in RecordStream(xml_file_path, record_type=record_type):
+        builder.add_fields(
+            attrs.get('type'),
+            attrs.get('sourceName'),
+            attrs.get('value'),
+            attrs.get('unit'),
+            parse_date(attrs.get('startDate')),
+            parse_date(attrs.get('endDate')),
+            parse_date(attrs.get('creationDate'))
+        )
+    return builder.build()
+
+
+def dumps(series_list: Iterable[CompressedSeries]) -> bytes:
+    """
+    Serialize compressed series to bytes (e.g., to send to another worker)
+    """
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    series_list = list(series_list)
+    _write_varint(out, len(series_list))
+
+    for series in series_list:
+        _write_string(out, series.record_type)
+        _write_string(out, series.unit)
+        _write_varint(out, len(series.sources))
+        for source in series.sources:
+            _write_string(out, source)
+        _write_varint(out, len(series.utc_offsets))
+        for offset in series.utc_offsets:
+            _write_varint(out, 0 if offset is None else _zigzag(offset) + 1)
+
+        _write_varint(out, len(series.blocks))
+        for block in series.blocks:
+            _write_varint(out, _zigzag(block.first))
+            _write_varint(out, block.last - block.first)
+            _write_varint(out, block.count)
+            _write_varint(out, len(block.payload))
+            out += block.payload
+
+    return bytes(out)
+
+
+def loads(data: bytes) -> List[CompressedSeries]:
+    """
+    Deserialize compressed series produced by dumps()
+
+    Raises:
+        ValueError: If the data is not a compressed series snapshot
+    """
+    return load(io.BytesIO(data))
+
+
+def dump(series_list: Iterable[CompressedSeries], fp: BinaryIO) -> None:
+    """
+    Write a snapshot of compressed series to a binary file object
+    """
+    fp.write(dumps(series_list))
+
+
+def load(
+    fp: BinaryIO,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    record_types: Optional[Iterable[str]] = None
+) -> List[CompressedSeries]:
+    """
+    Read a snapshot of compressed series from a binary file object
+
+    Blocks outside the time range, and series of other record types,
+    are skipped by seeking past them without reading their payloads.
+    Records at the edges of the range may still be included; use
+    iter_range() on the result for exact bounds.
+
+    Args:
+        fp: Seekable binary file object positioned at the snapshot
+        start: Only keep blocks that end on or after this date
+        end: Only keep blocks that start on or before this date
+        record_types: Only keep series of these record types
+
+    Returns:
+        List of CompressedSeries
+
+    Raises:
+        ValueError: If the file is not a compressed series snapshot
+    """
+    header = fp.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a compressed series snapshot")
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header[len(MAGIC)]}")
+
+    lo = None if start is None else _timestamp(start)
+    hi = None if end is None else _timestamp(end)
+    wanted = None if record_types is None else set(record_types)
+
+    series_list = []
+    for _ in range(_read_stream_varint(fp)):
+        series = CompressedSeries(
+            record_type=_read_stream_string(fp),
+            unit=_read_stream_string(fp)
+        )
+        for _ in range(_read_stream_varint(fp)):
+            series.sources.append(_read_stream_string(fp))
+        for _ in range(_read_stream_varint(fp)):
+            offset = _read_stream_varint(fp)
+            series.utc_offsets.append(None if offset == 0 else _unzigzag(offset - 1))
+
+        keep_series = wanted is None or series.record_type in wanted
+        for _ in range(_read_stream_varint(fp)):
+            first = _unzigzag(_read_stream_varint(fp))
+            last = first + _read_stream_varint(fp)
+            count = _read_stream_varint(fp)
+            size = _read_stream_varint(fp)
+            if not keep_series or (lo is not None and last < lo) or (hi is not None and first > hi):
+                fp.seek(size, 1)
+                continue
+            series.blocks.append(Block(first, last, count, fp.read(size)))
+
+        if keep_series:
+            series_list.append(series)
+
+    return series_list
+
+
+def _encode_block(rows: List[tuple]) -> Block:
+    """
+    Encode rows of (start, end offset, creation offset, source code,
+    start zone, end zone, creation zone, value), where offsets are
+    already zigzag + 1 coded with 0 for missing
+    """
+    payload = bytearray()
+
+    previous = rows[0][0]
+    previous_delta = 0
+    for row in rows[1:]:
+        delta = row[0] - previous
+        _write_varint(payload, _zigzag(delta - previous_delta))
+        previous, previous_delta = row[0], delta
+
+    for column in range(1, 7):
+        _encode_column(payload, [row[column] for row in rows])
+
+    _encode_values(payload, [row[7] for row in rows])
+    return Block(rows[0][0], rows[-1][0], len(rows), bytes(payload))
+
+
+def _encode_column(out: bytearray, values: List[int]) -> None:
+    """Encode unsigned integers plainly or run-length coded, whichever is smaller"""
+    plain = bytearray()
+    for value in values:
+        _write_varint(plain, value)
+
+    runs = bytearray()
+    start = 0
+    for i in range(1, len(values) + 1):
+        if i == len(values) or values[i] != values[start]:
+            _write_varint(runs, values[start])
+            _write_varint(runs, i - start)
+            start = i
+
+    if len(runs) < len(plain):
+        out.append(COLUMN_RUNS)
+        out += runs
+    else:
+        out.append(COLUMN_PLAIN)
+        out += plain
+
+
+def _decode_column(data: bytes, pos: int, count: int) -> Tuple[List[int], int]:
+    """Decode a column written by _encode_column()"""
+    method = data[pos]
+    pos += 1
+    if method == COLUMN_PLAIN:
+        return _read_varints(data, pos, count)
+
+    values: List[int] = []
+    while len(values) < count:
+        value, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        values.extend([value] * length)
+    return values, pos
+
+
+def _encode_values(out: bytearray, values: List[Optional[str]]) -> None:
+    """Encode a block's values with the most compact applicable method"""
+    decimals = []
+    for value in values:
+        match = _DECIMAL.match(value.strip()) if value else None
+        if match is None or not (match.group(2) or match.group(3)):
+            decimals = None
+            break
+        decimals.append(match)
+
+    if decimals is not None:
+        scale = max(len(match.group(3) or '') for match in decimals)
+        if scale <= MAX_DECIMALS:
+            out.append(VALUES_QUANTIZED)
+            out.append(scale)
+            previous = 0
+            for match in decimals:
+                sign, whole, fraction = match.groups()
+                number = int((whole or '0') + (fraction or '').ljust(scale, '0'))
+                if sign == '-':
+                    number = -number
+                _write_varint(out, _zigzag(number - previous))
+                previous = number
+            return
+
+    numbers = []
+    for value in values:
+        try:
+            numbers.append(float(value))
+        except (TypeError, ValueError):
+            numbers = None
+            break
+
+    if numbers is not None:
+        out.append(VALUES_XOR)
+        previous = 0
+        for number in numbers:
+            bits = int.from_bytes(_FLOAT.pack(number), 'big')
+            xor = bits ^ previous
+            previous = bits
+            raw = xor.to_bytes(8, 'big')
+            lead = len(raw) - len(raw.lstrip(b'\0'))
+            if lead == 8:
+                out.append(0x80)
+                continue
+            trail = len(raw) - len(raw.rstrip(b'\0'))
+            out.append(lead << 4 | trail)
+            out += raw[lead:8 - trail]
+        return
+
+    out.append(VALUES_STRINGS)
+    codes: Dict[Optional[str], int] = {}
+    table: List[Optional[str]] = []
+    indices = [_code(codes, table, value) for value in values]
+    _write_varint(out, len(table))
+    for value in table:
+        _write_string(out, value)
+    for index in indices:
+        _write_varint(out, index)
+
+
+def _decode_values(data: bytes, pos: int, count: int) -> Tuple[List[Optional[str]], int]:
+    """Decode a block's values back to strings"""
+    method = data[pos]
+    pos += 1
+
+    if method == VALUES_QUANTIZED:
+        scale = data[pos]
+        pos += 1
+        values = []
+        number = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            number += _unzigzag(delta)
+            values.append(_format_fixed(number, scale))
+        return values, pos
+
+    if method == VALUES_XOR:
+        values = []
+        previous = 0
+        for _ in range(count):
+            control = data[pos]
+            pos += 1
+            lead, trail = control >> 4, control & 0x0F
+            if lead == 8:
+                xor = 0
+            else:
+                size = 8 - lead - trail
+                xor = int.from_bytes(data[pos:pos + size], 'big') << (8 * trail)
+                pos += size
+            previous ^= xor
+            values.append(repr(_FLOAT.unpack(previous.to_bytes(8, 'big'))[0]))
+        return values, pos
+
+    if method == VALUES_STRINGS:
+        size, pos = _read_varint(data, pos)
+        table = []
+        for _ in range(size):
+            value, pos = _read_string(data, pos)
+            table.append(value)
+        codes, pos = _read_varints(data, pos, count)
+        return [table[code] for code in codes], pos
+
+    raise ValueError(f"Unknown value encoding: {method}")
+
+
+def _format_fixed(number: int, scale: int) -> str:
+    """Format a fixed-point integer without float rounding"""
+    if scale == 0:
+        return str(number)
+    digits = str(abs(number)).rjust(scale + 1, '0')
+    whole, fraction = digits[:-scale], digits[-scale:].rstrip('0')
+    text = f"{whole}.{fraction}" if fraction else whole
+    return f"-{text}" if number < 0 else text
+
+
+def _block_timestamps(block: Block) -> List[int]:
+    """Decode the delta-of-delta start timestamps of a block"""
+    data = block.payload
+    timestamps = [block.first]
+    previous = block.first
+    delta = 0
+    pos = 0
+    for _ in range(block.count - 1):
+        value, pos = _read_varint(data, pos)
+        delta += _unzigzag(value)
+        previous += delta
+        timestamps.append(previous)
+    return timestamps
+
+
+def _timestamps_size(block: Block) -> int:
+    """Number of payload bytes used by the start timestamps"""
+    data = block.payload
+    pos = 0
+    for _ in range(block.count - 1):
+        while data[pos] & 0x80:
+            pos += 1
+        pos += 1
+    return pos
+
+
+def _read_optional_offsets(data: bytes, pos: int, count: int) -> Tuple[List[Optional[int]], int]:
+    """Read offsets encoded as zigzag + 1, with 0 meaning missing"""
+    raw, pos = _decode_column(data, pos, count)
+    return [None if value == 0 else _unzigzag(value - 1) for value in raw], pos
+
+
+def _read_varints(data: bytes, pos: int, count: int) -> Tuple[List[int], int]:
+    """Read count consecutive varints"""
+    values = []
+    for _ in range(count):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values, pos
+
+
+def _code(codes: Dict, table: List, value) -> int:
+    """Get the dictionary code of a value, adding it if new"""
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(table)
+        table.append(value)
+    return code
+
+
+def _timestamp(moment: datetime) -> int:
+    """POSIX seconds for a datetime (naive datetimes are read as UTC)"""
+    if moment.tzinfo is None:
+        return int((moment - _EPOCH).total_seconds())
+    return int(moment.timestamp())
+
+
+def _utc_offset(moment: datetime) -> Optional[int]:
+    """UTC offset of a datetime in minutes, or None if it is naive"""
+    offset = moment.utcoffset()
+    return None if offset is None else int(offset.total_seconds() // 60)
+
+
+def _zone(offset: Optional[int]) -> Optional[timezone]:
+    """Timezone for a UTC offset in minutes"""
+    return None if offset is None else timezone(timedelta(minutes=offset))
+
+
+def _to_datetime(timestamp: int, zone: Optional[timezone]) -> datetime:
+    """Datetime for POSIX seconds, in the given zone (naive if None)"""
+    if zone is None:
+        return _EPOCH + timedelta(seconds=timestamp)
+    return datetime.fromtimestamp(timestamp, zone)
+
+
+def _zigzag(number: int) -> int:
+    """Map signed integers to unsigned ones (0, -1, 1, -2 -> 0, 1, 2, 3)"""
+    return number << 1 if number >= 0 else ((-number) << 1) - 1
+
+
+def _unzigzag(number: int) -> int:
+    """Inverse of _zigzag()"""
+    return number >> 1 if not number & 1 else -((number + 1) >> 1)
+
+
+def _write_varint(out: bytearray, number: int) -> None:
+    """Append an unsigned LEB128 varint"""
+    while number > 0x7F:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint, returning (value, new position)"""
+    number = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, pos
+        shift += 7
+
+
+def _write_string(out: bytearray, value: Optional[str]) -> None:
+    """Append a length-prefixed UTF-8 string (length 0 means None)"""
+    if value is None:
+        _write_varint(out, 0)
+        return
+    encoded = value.encode('utf-8')
+    _write_varint(out, len(encoded) + 1)
+    out += encoded
+
+
+def _read_string(data: bytes, pos: int) -> Tuple[Optional[str], int]:
+    """Read a string written by _write_string()"""
+    size, pos = _read_varint(data, pos)
+    if size == 0:
+        return None, pos
+    end = pos + size - 1
+    return data[pos:end].decode('utf-8'), end
+
+
+def _read_stream_varint(fp: BinaryIO) -> int:
+    """Read a varint directly from a file object"""
+    number = 0
+    shift = 0
+    while True:
+        byte = fp.read(1)
+        if not byte:
+            raise ValueError("Truncated compressed series snapshot")
+        number |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return number
+        shift += 7
+
+
+def _read_stream_string(fp: BinaryIO) -> Optional[str]:
+    """Read a string directly from a file object"""
+    size = _read_stream_varint(fp)
+    if size == 0:
+        return None
+    return fp.read(size - 1).decode('utf-8')
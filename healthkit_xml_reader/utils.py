@@ -29,6 +29,16 @@ def filter_by_date_range(
     ]
 
 
+def chronological_key(record: HealthRecord) -> tuple:
+    """
+    Sort key ordering records by start date, then record type and unit
+    
+    The command-line tool and the query daemon both list records in
+    this order, so they show the same records whichever answers.
+    """
+    return (record.start_date, record.record_type or '', record.unit or '')
+
+
 def group_by_date(records: List[HealthRecord]) -> Dict[str, List[HealthRecord]]:
     """
     Group health records by date (ignoring time)
@@ -46,7 +46,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "healthkit-parse=scripts.parse_health_data:main",
+            "healthkit-parse=healthkit_xml_reader.cli:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,96 @@
+"""
+Unit tests for the healthkit-parse command-line interface
+"""
+
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from healthkit_xml_reader.cli import main, _upgrade_legacy_argv
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_XML = os.path.join(PROJECT_ROOT, 'tests', 'fixtures', 'sample_export.xml')
+
+
+def load_startup_benchmark():
+    """Import benchmarks/bench_startup.py, which is not a package module"""
+    path = os.path.join(PROJECT_ROOT, 'benchmarks', 'bench_startup.py')
+    spec = importlib.util.spec_from_file_location('bench_startup', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_cli(*argv):
+    """Run the CLI in-process and return its output lines"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        main(list(argv))
+    return output.getvalue().splitlines()
+
+
+class TestCommandLine(unittest.TestCase):
+    """Test cases for healthkit_xml_reader.cli"""
+
+    def test_types_command(self):
+        """Test listing record types without a daemon"""
+        lines = run_cli('types', SAMPLE_XML, '--no-daemon')
+        self.assertIn('  StepCount', lines)
+        self.assertEqual(lines[-1], 'Total: 3 types')
+
+    def test_records_command(self):
+        """Test showing recent records of one type"""
+        lines = run_cli('records', SAMPLE_XML, '--type', 'StepCount', '--days', '100000', '--no-daemon')
+        self.assertIn('Found 2 records in last 100000 days', lines)
+
+    def test_legacy_arguments(self):
+        """Test that the older single-command form maps to subcommands"""
+        self.assertEqual(_upgrade_legacy_argv(['export.xml', '--list-types']), ['types', 'export.xml'])
+        self.assertEqual(
+            _upgrade_legacy_argv(['export.xml', '--type', 'HeartRate', '--days', '3', '--no-daemon']),
+            ['records', 'export.xml', '--type', 'HeartRate', '--days', '3', '--no-daemon']
+        )
+        self.assertEqual(_upgrade_legacy_argv(['types', 'export.xml']), ['types', 'export.xml'])
+        self.assertEqual(_upgrade_legacy_argv(['--help']), ['--help'])
+
+    def test_legacy_arguments_with_leading_options(self):
+        """Test the older form with options before the export path"""
+        self.assertEqual(
+            _upgrade_legacy_argv(['--days', '100000', '--no-daemon', 'export.xml']),
+            ['records', 'export.xml', '--days', '100000', '--no-daemon']
+        )
+        self.assertEqual(_upgrade_legacy_argv(['--list-types', 'export.xml']), ['types', 'export.xml'])
+
+        script = os.path.join(PROJECT_ROOT, 'scripts', 'parse_health_data.py')
+        result = subprocess.run(
+            [sys.executable, script, '--days', '100000', '--no-daemon', SAMPLE_XML],
+            capture_output=True, text=True, check=True
+        )
+        self.assertIn('Found 5 records in last 100000 days', result.stdout)
+
+    def test_help_imports_stay_light(self):
+        """Test that --help does not import the parser or daemon"""
+        bench = load_startup_benchmark()
+        _, modules = bench.measure_once()
+        self.assertEqual(sorted(set(bench.FORBIDDEN_MODULES) & modules), [])
+
+    def test_package_submodules(self):
+        """Test that submodules are reachable as package attributes"""
+        code = (
+            "import healthkit_xml_reader\n"
+            "print(healthkit_xml_reader.models.HealthRecord.__name__)\n"
+            "print(healthkit_xml_reader.parser.HealthKitParser.__name__)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, PYTHONPATH=PROJECT_ROOT),
+            capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.split(), ['HealthRecord', 'HealthKitParser'])
+
+if __name__ == '__main__':
+    unittest.main()
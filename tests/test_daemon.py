@@ -0,0 +1,137 @@
+"""
+Unit tests for the warm query daemon
+"""
+
+import http.client
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from healthkit_xml_reader.client import DaemonClient
+from healthkit_xml_reader.daemon import LoadedExport, QueryServer
+from healthkit_xml_reader.parser import HealthKitParser
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_XML = os.path.join(PROJECT_ROOT, 'tests', 'fixtures', 'sample_export.xml')
+ALL_DAYS = 100000
+
+
+class TestQueryDaemon(unittest.TestCase):
+    """Test cases for QueryServer and DaemonClient"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.discovery_path = os.path.join(cls.tmp_dir.name, 'daemon.json')
+        cls.server = QueryServer([LoadedExport(SAMPLE_XML)])
+        cls.server.write_discovery_file(cls.discovery_path)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp_dir.cleanup()
+
+    def client(self):
+        client = DaemonClient.discover(SAMPLE_XML, self.discovery_path)
+        self.assertIsNotNone(client)
+        return client
+
+    def test_discover(self):
+        """Test that clients only find daemons serving the export"""
+        self.client()
+        missing = os.path.join(self.tmp_dir.name, 'missing.json')
+        self.assertIsNone(DaemonClient.discover(SAMPLE_XML, missing))
+        self.assertIsNone(DaemonClient.discover(__file__, self.discovery_path))
+
+    def test_requests_need_token_and_local_host(self):
+        """Test that requests without the token or from other hosts are refused"""
+        port = self.server.server_address[1]
+        token = f"Bearer {self.server.token}"
+        cases = [
+            ({'Authorization': token}, 200),
+            ({}, 401),
+            ({'Authorization': 'Bearer wrong'}, 401),
+            ({'Authorization': token, 'Host': f'attacker.example:{port}'}, 403),
+        ]
+        for headers, status in cases:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            try:
+                connection.request('GET', '/health', headers=headers)
+                response = connection.getresponse()
+                response.read()
+            finally:
+                connection.close()
+            self.assertEqual(response.status, status, headers)
+
+    @unittest.skipIf(os.name != 'posix', "file modes are POSIX-specific")
+    def test_discovery_file_private(self):
+        """Test that the discovery file is readable by its owner only"""
+        mode = stat.S_IMODE(os.stat(self.discovery_path).st_mode)
+        self.assertEqual(mode, 0o600)
+        with open(self.discovery_path, encoding='utf-8') as discovery_file:
+            self.assertEqual(json.load(discovery_file)['token'], self.server.token)
+
+    def test_queries_match_parser(self):
+        """Test that daemon answers match parsing the file directly"""
+        client = self.client()
+        parser = HealthKitParser(SAMPLE_XML)
+        self.assertEqual(client.record_types(), parser.get_record_types())
+
+        steps = parser.parse_records('HKQuantityTypeIdentifierStepCount')
+        count, records = client.records('HKQuantityTypeIdentifierStepCount', days=ALL_DAYS)
+        self.assertEqual(count, len(steps))
+        self.assertEqual(records, list(steps))
+
+        count, records = client.records(days=ALL_DAYS, limit=2)
+        self.assertEqual(count, len(parser.parse_records()))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(client.records('HKQuantityTypeIdentifierStepCount', days=0)[0], 0)
+
+    def test_aggregate(self):
+        """Test per-day aggregation and error reporting"""
+        client = self.client()
+        self.assertEqual(client.aggregate('HKQuantityTypeIdentifierStepCount'), {'2024-02-15': 6912.0})
+        self.assertEqual(client.aggregate('HKQuantityTypeIdentifierHeartRate', function='max'),
+                         {'2024-02-15': 88.0})
+        with self.assertRaises(ValueError):
+            client.aggregate('HKQuantityTypeIdentifierHeartRate', function='median')
+
+    def test_concurrent_queries(self):
+        """Test that queries from many threads are answered correctly"""
+        client = self.client()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            counts = list(executor.map(
+                lambda _: client.records('HKQuantityTypeIdentifierHeartRate', days=ALL_DAYS)[0],
+                range(32)
+            ))
+        self.assertEqual(counts, [2] * 32)
+
+    def test_cli_uses_daemon(self):
+        """Test that the command-line script queries a running daemon"""
+        script = os.path.join(PROJECT_ROOT, 'scripts', 'parse_health_data.py')
+        env = dict(os.environ, HEALTHKIT_DAEMON_FILE=self.discovery_path)
+        for type_args in (['--type', 'HeartRate'], []):
+            outputs = []
+            for extra in ([], ['--no-daemon']):
+                result = subprocess.run(
+                    [sys.executable, script, SAMPLE_XML, '--days', str(ALL_DAYS)] + type_args + extra,
+                    env=env, capture_output=True, text=True, check=True
+                )
+                outputs.append(result.stdout.splitlines())
+
+            self.assertIn('Querying daemon', outputs[0][0])
+            self.assertIn('Loading data', outputs[1][0])
+            self.assertEqual(outputs[0][3:], outputs[1][3:])
+
+
+if __name__ == '__main__':
+    unittest.main()
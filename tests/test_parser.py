@@ -2,8 +2,16 @@
 Unit tests for the HealthKitParser class
 """
 
+import math
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
 import unittest
-from datetime import datetime
+import xml.etree.ElementTree as ET
+from datetime import date, datetime
 from healthkit_xml_reader.parser import HealthKitParser
 from healthkit_xml_reader.models import HealthRecord
 
@@ -45,7 +53,223 @@ class TestHealthKitParser(unittest.TestCase):
         
         with self.assertRaises(FileNotFoundError):
             parser.load_xml()
-    
+
+    def test_iter_activity_summaries(self):
+        """Test that all ring fields, including goals, are parsed"""
+        parser = HealthKitParser(self.sample_xml_path)
+        summaries = list(parser.iter_activity_summaries())
+        self.assertEqual(len(summaries), 5)
+
+        first = summaries[0]
+        self.assertEqual(first.date, datetime(2024, 2, 11))
+        self.assertEqual(first.active_energy_burned, 512.5)
+        self.assertEqual(first.active_energy_burned_goal, 500.0)
+        self.assertEqual(first.active_energy_burned_unit, 'Cal')
+        self.assertEqual(first.apple_move_time, 0.0)
+        self.assertEqual(first.apple_exercise_time_goal, 30.0)
+        self.assertEqual(first.apple_stand_hours, 12)
+        self.assertEqual(first.apple_stand_hours_goal, 12)
+
+    def test_iter_activity_summaries_streams(self):
+        """Test that activity summaries are read without loading the tree"""
+        parser = HealthKitParser(self.sample_xml_path)
+        streamed = list(parser.iter_activity_summaries())
+        self.assertIsNone(parser.root)
+
+        parser.load_xml()
+        self.assertEqual(streamed, list(parser.iter_activity_summaries()))
+
+    def test_parse_activity_summaries_lookup(self):
+        """Test date-indexed lookup on the activity summary table"""
+        parser = HealthKitParser(self.sample_xml_path)
+        table = parser.parse_activity_summaries()
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.dates[0], date(2024, 2, 11))
+        self.assertEqual(table.dates[-1], date(2024, 2, 16))
+
+        self.assertEqual(table['2024-02-13'].apple_stand_hours, 9)
+        self.assertEqual(table[date(2024, 2, 12)].active_energy_burned, 640.0)
+        self.assertIn(datetime(2024, 2, 15, 18, 0), table)
+        self.assertNotIn('2024-02-14', table)
+        self.assertIsNone(table.get('2024-02-14'))
+        with self.assertRaises(KeyError):
+            table['2024-02-14']
+
+    def test_activity_summary_streaks(self):
+        """Test goal completion and streaks across a missing day"""
+        parser = HealthKitParser(self.sample_xml_path)
+        table = parser.parse_activity_summaries()
+
+        self.assertEqual(table.goal_met('move'), [True, True, False, True, False])
+        self.assertEqual(table.goal_met('move_time'), [False] * 4 + [True])
+        # 2024-02-16 has a move time goal, which 'all' uses as its move ring
+        self.assertEqual(table.goal_met(), [True, True, False, True, True])
+        self.assertEqual(table.completion_rate(), 0.8)
+        self.assertEqual(table.longest_streak(), 2)
+        # 2024-02-14 is missing, so 2024-02-15 starts a new streak
+        self.assertEqual(table.current_streak(), 2)
+        self.assertEqual(table.current_streak('move'), 0)
+        with self.assertRaises(ValueError):
+            table.goal_met('sleep')
+
+    def test_parse_records_streaming(self):
+        """Test that records stream without loading the tree"""
+        parser = HealthKitParser(self.sample_xml_path)
+        records = parser.parse_records()
+        self.assertIsNone(parser.root)
+        self.assertEqual(len(records), 5)
+        self.assertIsInstance(records[0], HealthRecord)
+        self.assertIsNone(records.metadata)
+        self.assertIsNone(records.beats)
+
+        steps = parser.parse_records('HKQuantityTypeIdentifierStepCount')
+        self.assertEqual([r.value for r in steps], ['1234', '5678'])
+        self.assertEqual(steps[1].source_name, 'Apple Watch')
+
+        with self.assertRaises(ValueError):
+            parser.parse_records(include=['workouts'])
+
+    def test_parse_records_metadata_and_beats(self):
+        """Test metadata and HRV beat side tables linked to records"""
+        parser = HealthKitParser(self.sample_xml_path)
+        records = parser.parse_records(include=['metadata', 'beats'])
+
+        self.assertEqual(len(records.metadata), 2)
+        self.assertEqual(records.metadata.for_record(0), {})
+        self.assertEqual(records.metadata.for_record(3), {'HKAlgorithmVersion': '2'})
+        self.assertEqual(records.metadata.for_record(4),
+                         {'HKMetadataKeyHeartRateMotionContext': '1'})
+
+        bpm, offsets = records.beats.for_record(3)
+        self.assertEqual(list(bpm), [62.0, 64.0, 61.0])
+        # The last reading falls after midnight and wraps around
+        self.assertEqual([round(o, 2) for o in offsets], [1.25, 2.19, 60.5])
+        self.assertEqual(len(records.beats.for_record(4)[0]), 0)
+
+    def test_parse_records_from_loaded_tree(self):
+        """Test that a loaded tree gives the same result as streaming"""
+        streamed = HealthKitParser(self.sample_xml_path).parse_records(
+            include=['metadata', 'beats']
+        )
+        parser = HealthKitParser(self.sample_xml_path)
+        parser.load_xml()
+        loaded = parser.parse_records(include=['metadata', 'beats'])
+
+        self.assertEqual(list(loaded), list(streamed))
+        self.assertEqual(loaded.metadata, streamed.metadata)
+        self.assertEqual(loaded.beats, streamed.beats)
+
+    def test_parse_records_malformed_xml(self):
+        """Test that streaming reports malformed XML as ET.ParseError"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            xml_path = os.path.join(tmp_dir, 'export.xml')
+            with open(xml_path, 'w') as xml_file:
+                xml_file.write('<HealthData><Record type="x"></HealthData>')
+
+            with self.assertRaises(ET.ParseError):
+                HealthKitParser(xml_path).parse_records()
+
+        with self.assertRaises(FileNotFoundError):
+            HealthKitParser('nonexistent_file.xml').parse_records()
+
+    def test_parse_workouts_without_children(self):
+        """Test that workout child field groups are opt-in"""
+        parser = HealthKitParser(self.sample_xml_path)
+        workouts = parser.parse_workouts()
+        self.assertEqual(len(workouts), 2)
+        for workout in workouts:
+            self.assertIsNone(workout.events)
+            self.assertIsNone(workout.statistics)
+            self.assertIsNone(workout.metadata)
+            self.assertIsNone(workout.route)
+
+        with self.assertRaises(ValueError):
+            parser.parse_workouts(include=['laps'])
+
+    def test_parse_workouts_with_children(self):
+        """Test parsing events, statistics, metadata and route references"""
+        parser = HealthKitParser(self.sample_xml_path)
+        running, cycling = parser.parse_workouts(
+            include=['events', 'statistics', 'metadata', 'route']
+        )
+
+        self.assertEqual(running.events, [])
+        self.assertEqual(running.statistics, {})
+        self.assertIsNone(running.route)
+
+        self.assertEqual(cycling.metadata['HKTimeZone'], 'America/New_York')
+        self.assertEqual(len(cycling.events), 3)
+        self.assertEqual(cycling.events[0].event_type, 'HKWorkoutEventTypePause')
+        self.assertEqual(cycling.events[2].duration, 20.0)
+
+        heart_rate = cycling.statistics['HKQuantityTypeIdentifierHeartRate']
+        self.assertEqual(heart_rate.average, 131.0)
+        self.assertEqual(heart_rate.maximum, 162.0)
+        self.assertIsNone(heart_rate.sum)
+
+        self.assertEqual(cycling.route.file_path,
+                         '/workout-routes/route_2024-02-14_7.00am.gpx')
+        self.assertEqual(cycling.route.metadata['HKMetadataKeySyncVersion'], '2')
+        self.assertIsNone(cycling.route.track)
+
+    def test_load_workout_routes(self):
+        """Test that GPX routes load into compact trackpoint arrays"""
+        parser = HealthKitParser(self.sample_xml_path)
+        workouts = parser.parse_workouts(include=['route'])
+        loaded = parser.load_workout_routes(workouts, max_workers=2)
+        self.assertEqual(len(loaded), 1)
+
+        track = workouts[1].route.track
+        self.assertEqual(len(track), 3)
+        self.assertAlmostEqual(track.latitudes[0], 40.758896)
+        self.assertAlmostEqual(track.longitudes[2], -73.98465)
+        self.assertEqual(track.elevations[1], 13.0)
+        self.assertTrue(math.isnan(track.elevations[2]))
+        self.assertEqual(track.timestamps[1] - track.timestamps[0], 5.0)
+
+        # Already-loaded routes are skipped
+        self.assertEqual(parser.load_workout_routes(workouts), [])
+
+    def test_load_routes_in_worker_processes(self):
+        """Test that several routes are parsed in worker processes"""
+        from healthkit_xml_reader.models import WorkoutRoute
+        from healthkit_xml_reader.routes import load_routes
+
+        path = '/workout-routes/route_2024-02-14_7.00am.gpx'
+        routes = [WorkoutRoute(file_path=path), WorkoutRoute(file_path=path)]
+        export_dir = os.path.dirname(self.sample_xml_path)
+        # "spawn" is the default on macOS and Windows
+        spawn = multiprocessing.get_context('spawn')
+        self.assertEqual(len(load_routes(routes, export_dir, max_workers=2, mp_context=spawn)), 2)
+        for route in routes:
+            self.assertEqual(len(route.track), 3)
+            self.assertEqual(route.track.elevations[0], 12.5)
+
+    def test_load_routes_in_process_by_default(self):
+        """Test that a script without a main guard loads routes under spawn"""
+        code = textwrap.dedent(f"""
+            import multiprocessing
+            from healthkit_xml_reader.models import WorkoutRoute
+            from healthkit_xml_reader.routes import load_routes
+
+            multiprocessing.set_start_method('spawn')
+            path = '/workout-routes/route_2024-02-14_7.00am.gpx'
+            routes = [WorkoutRoute(file_path=path), WorkoutRoute(file_path=path)]
+            load_routes(routes, {os.path.dirname(os.path.abspath(self.sample_xml_path))!r})
+            print([len(route.track) for route in routes])
+        """)
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            script = os.path.join(tmp_dir, 'load_routes.py')
+            with open(script, 'w') as script_file:
+                script_file.write(code)
+            result = subprocess.run(
+                [sys.executable, script],
+                env=dict(os.environ, PYTHONPATH=project_root),
+                capture_output=True, text=True, check=True
+            )
+        self.assertEqual(result.stdout.strip(), '[3, 3]')
+
     # TODO: Add more tests once you have sample XML data
     # - test_parse_records()
     # - test_parse_workouts()
@@ -0,0 +1,149 @@
+"""
+Unit tests for checkpointed, resumable parsing
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from healthkit_xml_reader.parser import HealthKitParser
+from healthkit_xml_reader.resume import CsvSink, RecordSink, load_checkpoint
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parses with checkpoints, then dies without cleanup part-way through
+CRASHING_PARSE = textwrap.dedent('''
+    import os, sys
+    from healthkit_xml_reader.parser import HealthKitParser
+    from healthkit_xml_reader.resume import CsvSink
+
+    class CrashingSink(CsvSink):
+        writes = 0
+        def write(self, records):
+            super().write(records)
+            self.writes += 1
+            if self.writes == int(sys.argv[4]):
+                self._file.flush()
+                os._exit(9)
+
+    HealthKitParser(sys.argv[1]).parse_records_resumable(
+        CrashingSink(sys.argv[2]), sys.argv[3], checkpoint_every=250)
+''')
+
+
+def write_synthetic_export(path, count):
+    """Write an export with plain records and records inside correlations"""
+    with open(path, 'w', encoding='utf-8') as xml_file:
+        xml_file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        xml_file.write('<!DOCTYPE HealthData [\n<!ELEMENT HealthData (Record|Correlation)*>\n]>\n')
+        xml_file.write('<HealthData locale="en_US">\n')
+        for i in range(count):
+            minute = f"{i // 60 % 24:02d}:{i % 60:02d}"
+            if i % 97 == 0:
+                xml_file.write(
+                    f' <Correlation type="HKCorrelationTypeIdentifierBloodPressure">\n'
+                    f'  <Record type="HKQuantityTypeIdentifierBloodPressureSystolic" sourceName="Cuff" '
+                    f'value="{110 + i % 20}" unit="mmHg" startDate="2024-02-15 {minute}:00 -0500"/>\n'
+                    f'  <Record type="HKQuantityTypeIdentifierBloodPressureDiastolic" sourceName="Cuff" '
+                    f'value="{70 + i % 15}" unit="mmHg" startDate="2024-02-15 {minute}:00 -0500"/>\n'
+                    f' </Correlation>\n'
+                )
+            xml_file.write(
+                f' <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" '
+                f'value="{60 + i % 40}" unit="count/min" startDate="2024-02-15 {minute}:00 -0500" '
+                f'endDate="2024-02-15 {minute}:00 -0500">\n'
+                f'  <MetadataEntry key="HKMetadataKeyHeartRateMotionContext" value="1"/>\n'
+                f' </Record>\n'
+            )
+        xml_file.write('</HealthData>\n')
+
+
+class TestResumableParse(unittest.TestCase):
+    """Test cases for HealthKitParser.parse_records_resumable"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmp_dir.name, 'export.xml')
+        write_synthetic_export(self.xml_path, 3000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def read(self, name):
+        with open(self.path(name), encoding='utf-8') as output:
+            return output.read()
+
+    def test_uninterrupted_parse(self):
+        """Test that a full run matches parse_records and is not repeated"""
+        parser = HealthKitParser(self.xml_path)
+        total = parser.parse_records_resumable(
+            CsvSink(self.path('out.csv')), self.path('ckpt.json'), checkpoint_every=500)
+
+        expected = parser.parse_records()
+        self.assertEqual(total, len(expected))
+        rows = self.read('out.csv').splitlines()
+        self.assertEqual(len(rows), len(expected) + 1)
+        self.assertTrue(load_checkpoint(self.path('ckpt.json')).complete)
+
+        # A finished parse is not redone
+        total = parser.parse_records_resumable(
+            CsvSink(self.path('other.csv')), self.path('ckpt.json'))
+        self.assertEqual(total, len(expected))
+        self.assertFalse(os.path.exists(self.path('other.csv')))
+
+    def test_kill_and_resume(self):
+        """Test that a killed parse resumes without duplicates or gaps"""
+        HealthKitParser(self.xml_path).parse_records_resumable(
+            CsvSink(self.path('reference.csv')), self.path('reference.json'), checkpoint_every=250)
+
+        env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+        for crash_after in (5, 5):
+            result = subprocess.run(
+                [sys.executable, '-c', CRASHING_PARSE, self.xml_path,
+                 self.path('out.csv'), self.path('ckpt.json'), str(crash_after)],
+                env=env
+            )
+            self.assertEqual(result.returncode, 9)
+
+            checkpoint = load_checkpoint(self.path('ckpt.json'))
+            self.assertFalse(checkpoint.complete)
+            self.assertGreater(checkpoint.records, 0)
+            # Rows written after the checkpoint are on disk, to be rolled back
+            self.assertGreater(os.path.getsize(self.path('out.csv')), checkpoint.sink_state['size'])
+
+        total = HealthKitParser(self.xml_path).parse_records_resumable(
+            CsvSink(self.path('out.csv')), self.path('ckpt.json'), checkpoint_every=250)
+        self.assertEqual(total, load_checkpoint(self.path('reference.json')).records)
+        self.assertEqual(self.read('out.csv'), self.read('reference.csv'))
+
+    def test_changed_file_restarts(self):
+        """Test that a checkpoint for a modified export is not reused"""
+        parser = HealthKitParser(self.xml_path)
+        parser.parse_records_resumable(CsvSink(self.path('out.csv')), self.path('ckpt.json'))
+        write_synthetic_export(self.xml_path, 10)
+
+        total = parser.parse_records_resumable(CsvSink(self.path('out.csv')), self.path('ckpt.json'))
+        self.assertEqual(total, len(parser.parse_records()))
+        self.assertEqual(len(self.read('out.csv').splitlines()), total + 1)
+
+    def test_incomplete_sink_rejected(self):
+        """Test that a sink missing commit() fails when it is created"""
+        class ListSink(RecordSink):
+            def restore(self, state):
+                self.records = []
+
+            def write(self, records):
+                self.records.extend(records)
+
+        with self.assertRaises(TypeError):
+            ListSink()
+
+
+if __name__ == '__main__':
+    unittest.main()
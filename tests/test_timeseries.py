@@ -0,0 +1,157 @@
+"""
+Unit tests for the compressed time-series encoding
+"""
+
+import io
+import unittest
+from datetime import datetime, timedelta, timezone
+from healthkit_xml_reader.parser import HealthKitParser
+from healthkit_xml_reader.models import HealthRecord
+from healthkit_xml_reader.timeseries import (
+    compress_records, compress_export, dumps, loads, dump, load,
+    VALUES_QUANTIZED, VALUES_XOR, VALUES_STRINGS
+)
+
+
+EST = timezone(timedelta(hours=-5))
+
+
+def make_heart_rate(count, start=datetime(2024, 2, 15, 10, 0, tzinfo=EST)):
+    """Build regularly sampled heart rate records"""
+    records = []
+    for i in range(count):
+        moment = start + timedelta(seconds=5 * i)
+        records.append(HealthRecord(
+            record_type='HKQuantityTypeIdentifierHeartRate',
+            source_name='Apple Watch' if i % 10 else 'iPhone',
+            value=str(60 + i % 25),
+            unit='count/min',
+            start_date=moment,
+            end_date=moment,
+            creation_date=moment + timedelta(minutes=1)
+        ))
+    return records
+
+
+class TestTimeSeries(unittest.TestCase):
+    """Test cases for compress_records and snapshot serialization"""
+
+    def test_round_trip_fixture(self):
+        """Test that parsed records survive compression unchanged"""
+        records = HealthKitParser('tests/fixtures/sample_export.xml').parse_records()
+        series_list = loads(dumps(compress_records(records, block_size=2)))
+
+        decoded = [record for series in series_list for record in series]
+        key = lambda r: (r.record_type, r.start_date)
+        self.assertEqual(sorted(decoded, key=key), sorted(records, key=key))
+        self.assertEqual(decoded[0].start_date.utcoffset(), timedelta(hours=-5))
+
+    def test_round_trip_dates(self):
+        """Test creation dates without an end date and per-date UTC offsets"""
+        edt = timezone(timedelta(hours=-4))
+        no_end = HealthRecord(
+            'HKQuantityTypeIdentifierBodyMass', 'Scale', '81', 'kg',
+            start_date=datetime(2024, 3, 9, 1, 0, tzinfo=EST),
+            creation_date=datetime(2024, 3, 9, 2, 0, tzinfo=EST)
+        )
+        # Start and end on either side of a daylight saving change
+        mixed = HealthRecord(
+            'HKQuantityTypeIdentifierBodyMass', 'Scale', '80.5', 'kg',
+            start_date=datetime(2024, 3, 10, 1, 30, tzinfo=EST),
+            end_date=datetime(2024, 3, 10, 4, 0, tzinfo=edt),
+            creation_date=datetime(2024, 3, 10, 4, 5, tzinfo=edt)
+        )
+        series, = loads(dumps(compress_records([mixed, no_end])))
+
+        decoded = list(series)
+        self.assertEqual(decoded, [no_end, mixed])
+        self.assertEqual(decoded[0].creation_date.utcoffset(), timedelta(hours=-5))
+        self.assertIsNone(decoded[0].end_date)
+        self.assertEqual(decoded[1].start_date.utcoffset(), timedelta(hours=-5))
+        self.assertEqual(decoded[1].end_date.utcoffset(), timedelta(hours=-4))
+        self.assertEqual(decoded[1].creation_date.utcoffset(), timedelta(hours=-4))
+
+    def test_compress_export(self):
+        """Test that streaming an export matches compressing parsed records"""
+        path = 'tests/fixtures/sample_export.xml'
+        streamed = compress_export(path)
+        parsed = compress_records(HealthKitParser(path).parse_records())
+        self.assertEqual(dumps(streamed), dumps(parsed))
+
+        steps, = compress_export(path, record_type='HKQuantityTypeIdentifierStepCount')
+        self.assertEqual(steps.record_type, 'HKQuantityTypeIdentifierStepCount')
+
+    def test_compression_ratio(self):
+        """Test that regularly sampled records compress to a few bytes each"""
+        records = make_heart_rate(5000)
+        series, = compress_records(records)
+        self.assertEqual(len(series), 5000)
+        self.assertEqual(series.blocks[0].payload[_values_offset(series)], VALUES_QUANTIZED)
+        self.assertLess(series.nbytes / len(records), 4)
+        self.assertEqual(list(series), records)
+
+    def test_value_encodings(self):
+        """Test XOR-coded floats and dictionary-coded category values"""
+        start = datetime(2024, 2, 15, 10, 0, tzinfo=EST)
+        floats = [
+            HealthRecord('HKQuantityTypeIdentifierBodyMass', 'Scale', value, 'kg', start + timedelta(days=i))
+            for i, value in enumerate(['81.123456789', '1e-05', '-2.5'])
+        ]
+        categories = [
+            HealthRecord('HKCategoryTypeIdentifierSleepAnalysis', 'Watch', value, None, start + timedelta(hours=i))
+            for i, value in enumerate(['HKCategoryValueSleepAnalysisAsleepCore', None,
+                                       'HKCategoryValueSleepAnalysisAsleepCore'])
+        ]
+        sleep, mass = loads(dumps(compress_records(floats + categories)))
+
+        self.assertEqual(mass.blocks[0].payload[_values_offset(mass)], VALUES_XOR)
+        self.assertEqual([r.value for r in mass], ['81.123456789', '1e-05', '-2.5'])
+        self.assertEqual(sleep.blocks[0].payload[_values_offset(sleep)], VALUES_STRINGS)
+        self.assertEqual([r.value for r in sleep], [c.value for c in categories])
+        self.assertIsNone(next(iter(sleep)).end_date)
+
+    def test_iter_range(self):
+        """Test time range queries across block boundaries"""
+        records = make_heart_rate(1000)
+        series, = compress_records(records, block_size=100)
+        start = records[250].start_date
+        end = records[420].start_date
+
+        selected = list(series.iter_range(start, end))
+        self.assertEqual(selected, records[250:421])
+        self.assertEqual(list(series.iter_range(end=records[9].start_date)), records[:10])
+
+    def test_load_skips_blocks(self):
+        """Test that load() only reads blocks overlapping the range"""
+        records = make_heart_rate(1000) + HealthKitParser(
+            'tests/fixtures/sample_export.xml').parse_records('HKQuantityTypeIdentifierStepCount')
+        snapshot = io.BytesIO()
+        dump(compress_records(records, block_size=100), snapshot)
+        snapshot.seek(0)
+
+        series_list = load(
+            snapshot,
+            start=records[250].start_date,
+            end=records[420].start_date,
+            record_types=['HKQuantityTypeIdentifierHeartRate']
+        )
+        self.assertEqual(len(series_list), 1)
+        self.assertEqual([b.first for b in series_list[0].blocks],
+                         [series_list[0].blocks[0].first + 500 * i for i in range(3)])
+
+        with self.assertRaises(ValueError):
+            loads(b'not a snapshot')
+
+
+def _values_offset(series):
+    """Position of the value encoding byte in a series' first block"""
+    from healthkit_xml_reader.timeseries import _decode_column, _timestamps_size
+    block = series.blocks[0]
+    pos = _timestamps_size(block)
+    for _ in range(6):
+        _, pos = _decode_column(block.payload, pos, block.count)
+    return pos
+
+
+if __name__ == '__main__':
+    unittest.main()